@@ -1,6 +1,7 @@
 """Authentication routes"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from supabase import Client
 from typing import List
 
@@ -90,12 +91,13 @@ async def login(
                 detail="Invalid credentials"
             )
         
-        return Token(
-            access_token=auth_response.session.access_token,
-            refresh_token=auth_response.session.refresh_token,
-            token_type="bearer",
-            expires_in=auth_response.session.expires_in or 3600
-        )
+        # Known-good fields from Supabase; skip re-validating them through Token
+        return ORJSONResponse({
+            "access_token": auth_response.session.access_token,
+            "refresh_token": auth_response.session.refresh_token,
+            "token_type": "bearer",
+            "expires_in": auth_response.session.expires_in or 3600
+        })
         
     except Exception as e:
         print(f"Login error: {e}")
@@ -140,7 +142,8 @@ async def check_auth(
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Check if user is authenticated and return user info"""
-    return current_user
+    # current_user is already a validated UserResponse
+    return ORJSONResponse(current_user.model_dump())
 
 
 @router.get("/debug")
@@ -176,7 +179,7 @@ async def get_current_user_profile(
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get current user profile"""
-    return current_user
+    return ORJSONResponse(current_user.model_dump())
 
 
 @router.put("/me", response_model=UserResponse)
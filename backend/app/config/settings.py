@@ -45,6 +45,9 @@ class Settings(BaseSettings):
     max_dataset_size: int = Field(default=100000, description="Maximum dataset size for analysis")
     cache_results: bool = Field(default=True, description="Cache analysis results")
     
+    # Figure Rendering
+    render_workers: int = Field(default=2, description="Worker processes used to render figures")
+    
     @field_validator('allowed_origins')
     @classmethod
     def parse_cors_origins(cls, v):
@@ -120,6 +123,9 @@ class Settings(BaseSettings):
         if self.max_file_size < 1024:  # At least 1KB
             validation_errors.append("Max file size must be at least 1KB")
         
+        if self.render_workers < 1:
+            validation_errors.append("Render workers must be at least 1")
+        
         if self.access_token_expire_minutes < 1:
             validation_errors.append("Access token expiration must be at least 1 minute")
         
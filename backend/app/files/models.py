@@ -1,6 +1,6 @@
 """File and dataset models"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -47,7 +47,7 @@ class DatasetListResponse(BaseModel):
 
 class DatasetDataResponse(BaseModel):
     """Model for dataset data response"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
     columns: List[str]
     total_rows: int
     limit: Optional[int] = None
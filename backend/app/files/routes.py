@@ -1,12 +1,16 @@
 """File upload and dataset management routes"""
 
 import os
+import shutil
 import uuid
 import json
 import pandas as pd
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from supabase import Client
 
 from ..config.settings import settings
@@ -22,6 +26,21 @@ router = APIRouter(prefix="/files", tags=["files"])
 # File Upload Routes
 # =====================================
 
+def _save_upload(source, file_path: str) -> None:
+    """Copy an upload's spooled file to disk"""
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(source, f)
+
+
+def _read_delimited(file_path: str, sep: str = ',') -> pd.DataFrame:
+    """Read a delimited file, using pyarrow's multithreaded parser when available"""
+    try:
+        return pd.read_csv(file_path, sep=sep, engine='pyarrow')
+    except (ImportError, ValueError):
+        # pyarrow missing, or input it cannot parse (ragged rows, odd quoting)
+        return pd.read_csv(file_path, sep=sep)
+
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
@@ -47,25 +66,34 @@ async def upload_file(
             detail=f"File size exceeds maximum limit of {settings.max_file_size} bytes"
         )
     
+    # Reject empty uploads before touching the disk or the parsers
+    first_byte = await file.read(1)
+    if not first_byte:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is empty"
+        )
+    
     try:
         # Generate unique filename
         file_id = str(uuid.uuid4())
         safe_filename = f"{file_id}_{file.filename}"
         file_path = os.path.join(settings.upload_dir, safe_filename)
         
-        # Save file to disk
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Stream the spooled upload to disk instead of holding a second copy in
+        # memory; the copy runs in the threadpool so it does not block the loop
+        await file.seek(0)
+        await run_in_threadpool(_save_upload, file.file, file_path)
+        file_size = os.path.getsize(file_path)
         
         # Parse the file to get metadata
         try:
             if file_ext == '.csv':
-                df = pd.read_csv(file_path)
+                df = _read_delimited(file_path)
             elif file_ext in ['.xlsx', '.xls']:
                 df = pd.read_excel(file_path)
             elif file_ext == '.tsv':
-                df = pd.read_csv(file_path, sep='\t')
+                df = _read_delimited(file_path, sep='\t')
             elif file_ext == '.txt':
                 # Try to detect separator
                 with open(file_path, 'r') as f:
@@ -81,7 +109,7 @@ async def upload_file(
             
             # Convert datetime columns to strings for JSON serialization
             for col in df.columns:
-                if df[col].dtype == 'datetime64[ns]':
+                if pd.api.types.is_datetime64_any_dtype(df[col]):
                     df[col] = df[col].astype(str)
             
             columns = df.columns.tolist()
@@ -91,7 +119,7 @@ async def upload_file(
             metadata = {
                 'file_extension': file_ext,
                 'original_filename': file.filename,
-                'column_types': {col: str(df[col].dtype) for col in df.columns},
+                'column_types': df.dtypes.astype(str).to_dict(),
                 'file_path': file_path,
                 'encoding': 'utf-8'
             }
@@ -113,7 +141,7 @@ async def upload_file(
             'id': file_id,
             'name': os.path.splitext(file.filename)[0],
             'file_name': file.filename,
-            'file_size': len(content),
+            'file_size': file_size,
             'columns_info': columns,
             'row_count': rows,
             'user_id': current_user.id,
@@ -166,6 +194,54 @@ async def upload_file(
 # Dataset Management Routes
 # =====================================
 
+# Files larger than this are re-read on every request instead of being cached,
+# so the frame cache holds at most _DATASET_CACHE_SIZE files of this size
+_DATASET_CACHE_MAX_FILE_BYTES = 10 * 1024 * 1024
+_DATASET_CACHE_SIZE = 8
+
+
+def _load_dataset_frame(file_path: str, file_ext: str) -> pd.DataFrame:
+    """Read a stored dataset file, prepared for JSON output
+    
+    Small files are cached on path and modification time so paging through a
+    dataset does not re-parse the whole file for every page. Callers must not
+    modify the frame.
+    """
+    if os.path.getsize(file_path) > _DATASET_CACHE_MAX_FILE_BYTES:
+        return _read_dataset_frame(file_path, file_ext)
+    return _cached_dataset_frame(file_path, file_ext, os.path.getmtime(file_path))
+
+
+@lru_cache(maxsize=_DATASET_CACHE_SIZE)
+def _cached_dataset_frame(file_path: str, file_ext: str, mtime: float) -> pd.DataFrame:
+    """``_read_dataset_frame`` memoized on path and modification time"""
+    return _read_dataset_frame(file_path, file_ext)
+
+
+def _read_dataset_frame(file_path: str, file_ext: str) -> pd.DataFrame:
+    """Parse a dataset file and make its columns JSON-safe"""
+    if file_ext == '.csv':
+        df = _read_delimited(file_path)
+    elif file_ext in ['.xlsx', '.xls']:
+        df = pd.read_excel(file_path)
+    elif file_ext == '.tsv':
+        df = _read_delimited(file_path, sep='\t')
+    elif file_ext == '.txt':
+        df = pd.read_csv(file_path, sep=None, engine='python')
+    else:
+        raise ValueError(f"Unsupported file type: {file_ext}")
+    
+    # Convert problematic columns to strings for JSON serialization
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].astype(str)
+        # Handle NaN values which cause JSON serialization issues
+        elif df[col].dtype == 'object':
+            df[col] = df[col].fillna('')
+    
+    return df
+
+
 @router.get("/datasets", response_model=DatasetListResponse)
 async def list_datasets(
     page: int = Query(1, ge=1, description="Page number"),
@@ -262,6 +338,7 @@ async def get_dataset_data(
     dataset_id: str,
     limit: Optional[int] = Query(None, ge=1, le=10000, description="Limit number of rows"),
     offset: Optional[int] = Query(None, ge=0, description="Skip number of rows"),
+    orient: str = Query("records", pattern="^(records|columns)$", description="Row dicts, or one list per column"),
     current_user: UserResponse = Depends(get_current_active_user),
     db: Client = Depends(get_user_authenticated_db_client)
 ):
@@ -289,24 +366,7 @@ async def get_dataset_data(
         file_ext = dataset['metadata'].get('file_extension', '.csv')
         
         try:
-            if file_ext == '.csv':
-                df = pd.read_csv(file_path)
-            elif file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
-            elif file_ext == '.tsv':
-                df = pd.read_csv(file_path, sep='\t')
-            elif file_ext == '.txt':
-                df = pd.read_csv(file_path, sep=None, engine='python')
-            else:
-                raise ValueError(f"Unsupported file type: {file_ext}")
-            
-            # Convert problematic columns to strings for JSON serialization
-            for col in df.columns:
-                if df[col].dtype == 'datetime64[ns]':
-                    df[col] = df[col].astype(str)
-                # Handle NaN values which cause JSON serialization issues
-                elif df[col].dtype == 'object':
-                    df[col] = df[col].fillna('')
+            df = await run_in_threadpool(_load_dataset_frame, file_path, file_ext)
             
             total_rows = len(df)
             
@@ -316,16 +376,20 @@ async def get_dataset_data(
             if limit is not None:
                 df = df.head(limit)
             
-            # Convert to records (list of dicts) with NaN handling
-            data = df.fillna('').to_dict('records')
+            # Convert to records (list of dicts) or columns (dict of lists) with NaN
+            # handling; the columnar form avoids building a dict per row
+            page = df.fillna('')
+            data = page.to_dict('list') if orient == 'columns' else page.to_dict('records')
             
-            return DatasetDataResponse(
-                data=data,
-                columns=df.columns.tolist(),
-                total_rows=total_rows,
-                limit=limit,
-                offset=offset
-            )
+            # The rows are already JSON-ready, so skip model validation and
+            # jsonable_encoder; orjson serializes the page directly
+            return ORJSONResponse({
+                'data': data,
+                'columns': df.columns.tolist(),
+                'total_rows': total_rows,
+                'limit': limit,
+                'offset': offset
+            })
             
         except Exception as e:
             raise HTTPException(
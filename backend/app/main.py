@@ -3,7 +3,7 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import time
 import os
@@ -14,6 +14,7 @@ from .utils.logging import RequestLoggingMiddleware, StructuredLogger
 from .auth.routes import router as auth_router
 from .statistical.routes import router as statistical_router
 from .visualization.routes import router as visualization_router
+from .visualization.services import shutdown_render_pool
 from .projects.routes import router as projects_router
 from .analyses.routes import router as analyses_router
 from .figure_analysis.routes import router as figure_analysis_router
@@ -59,6 +60,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("👋 Application shutting down")
     logger.info("Application shutting down")
+    shutdown_render_pool()
 
 
 # Create FastAPI application
@@ -66,6 +68,7 @@ app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Advanced statistical analysis and visualization platform for scientific research",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -0,0 +1,36 @@
+"""Array kernels shared by the statistical services and the legacy server"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, List, Tuple
+
+
+def crosstab_counts(rows: pd.Series, cols: pd.Series) -> Tuple[np.ndarray, List[Any], List[Any]]:
+    """Cross-tabulate two categorical columns into an integer count matrix
+
+    Levels are sorted as ``pd.crosstab`` would, and rows missing either value
+    are skipped.
+    """
+    row_codes, row_levels = pd.factorize(rows, sort=True)
+    col_codes, col_levels = pd.factorize(cols, sort=True)
+    observed = (row_codes >= 0) & (col_codes >= 0)
+    table = np.zeros((len(row_levels), len(col_levels)), dtype=np.int64)
+    np.add.at(table, (row_codes[observed], col_codes[observed]), 1)
+    return table, list(row_levels), list(col_levels)
+
+
+def km_median(time: np.ndarray, event: np.ndarray) -> float:
+    """Kaplan-Meier median survival time, or ``inf`` when survival never drops to one half
+
+    Matches ``KaplanMeierFitter.median_survival_time_`` without building the
+    fitter's event tables: one ``np.unique`` over the durations gives deaths and
+    the population at risk at each distinct time.
+    """
+    times, inverse = np.unique(time, return_inverse=True)
+    deaths = np.bincount(inverse, weights=event, minlength=len(times))
+    removed = np.bincount(inverse, minlength=len(times))
+    at_risk = len(time) - np.concatenate(([0], np.cumsum(removed)[:-1]))
+    with np.errstate(divide='ignore'):
+        survival = np.exp(np.cumsum(np.log(at_risk - deaths) - np.log(at_risk)))
+    below = np.flatnonzero(survival <= 0.5)
+    return float(times[below[0]]) if below.size else np.inf
@@ -1,12 +1,12 @@
 """Statistical analysis models"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
 
 
 class AnalysisRequest(BaseModel):
     """Base analysis request model"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -14,9 +14,17 @@ class AnalysisRequest(BaseModel):
     event_variable: Optional[str] = None
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Batch analysis request model: one test run over several outcome variables"""
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
+    outcome_variables: List[str]
+    group_variable: str
+    analysis_type: str
+
+
 class MultivariateAnalysisRequest(BaseModel):
     """Multivariate analysis request model"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
     outcome_variable: str
     predictor_variables: List[str]
     analysis_type: str = "multivariate_analysis"
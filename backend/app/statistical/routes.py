@@ -1,12 +1,17 @@
 """Statistical analysis routes"""
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import Optional
-import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 import time
 
-from .models import AnalysisRequest, MultivariateAnalysisRequest, StatisticalResult, MultivariateResult
-from .services import StatisticalAnalysisService
+from .models import (
+    AnalysisRequest, BatchAnalysisRequest, MultivariateAnalysisRequest,
+    StatisticalResult, MultivariateResult
+)
+from .services import get_statistical_service, frame_from_records, NUMERIC_OUTCOME_TESTS
+from ..visualization.services import run_in_render_thread
 from ..auth.dependencies import get_current_active_user, get_optional_user
 from ..auth.models import UserResponse
 from ..config.database import get_admin_db_client
@@ -67,14 +72,23 @@ async def analyze_data(
                 detail=detail
             )
         
-        # Convert to DataFrame
-        df = pd.DataFrame(request.data)
+        # Convert to DataFrame, keeping only the variables the test uses
+        numeric = [request.time_variable]
+        if request.analysis_type in NUMERIC_OUTCOME_TESTS:
+            numeric.append(request.outcome_variable)
+        df = await run_in_threadpool(frame_from_records, request.data, [
+            request.outcome_variable,
+            request.group_variable,
+            request.time_variable,
+            request.event_variable
+        ], numeric)
         
         # Initialize statistical service
-        stats_service = StatisticalAnalysisService()
+        stats_service = get_statistical_service()
         
-        # Perform analysis
-        result = stats_service.perform_analysis(
+        # Perform analysis off the event loop
+        result = await run_in_threadpool(
+            stats_service.perform_analysis,
             df=df,
             analysis_type=request.analysis_type,
             outcome_var=request.outcome_variable,
@@ -93,7 +107,9 @@ async def analyze_data(
             request_id=request_id
         )
         
-        return result
+        # The result was built by our own service, so skip re-validating it
+        # against response_model on the way out
+        return ORJSONResponse(result.model_dump())
         
     except HTTPException:
         # Log failed completion for HTTP exceptions (like usage limits)
@@ -139,6 +155,106 @@ async def analyze_data(
         )
 
 
+@router.post("/analyze/batch", response_model=List[StatisticalResult])
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    http_request: Request,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    admin_db: Client = Depends(get_admin_db_client)
+):
+    """Run one statistical test for several outcome variables in a single request
+    
+    The payload is parsed once, but each outcome variable counts as one
+    statistical analysis towards the usage limits; a batch that would exceed
+    the remaining allowance is rejected without using any of it.
+    """
+    request_id = get_request_id(http_request)
+    user_id = current_user.id if current_user else None
+    start_time = time.time()
+    
+    api_logger.log_analysis_start(
+        analysis_type=request.analysis_type,
+        user_id=user_id,
+        request_id=request_id
+    )
+    
+    try:
+        limiter = UsageLimiter(admin_db)
+        
+        allowed = await limiter.check_and_increment_usage(
+            http_request, 
+            'statistical_analysis', 
+            user_id,
+            amount=len(request.outcome_variables)
+        )
+        
+        if not allowed:
+            api_logger.log_usage_limit_hit(
+                feature_type='statistical_analysis',
+                user_id=user_id,
+                ip_address=getattr(http_request.client, 'host', None),
+                request_id=request_id
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Usage limit exceeded for statistical analyses."
+            )
+        
+        # Convert to DataFrame once for all outcomes
+        df = await run_in_threadpool(
+            frame_from_records, request.data, [*request.outcome_variables, request.group_variable],
+            request.outcome_variables if request.analysis_type in NUMERIC_OUTCOME_TESTS else ()
+        )
+        
+        stats_service = get_statistical_service()
+        results = await run_in_threadpool(
+            stats_service.perform_batch_analysis,
+            df=df,
+            analysis_type=request.analysis_type,
+            outcome_vars=request.outcome_variables,
+            group_var=request.group_variable
+        )
+        
+        api_logger.log_analysis_complete(
+            analysis_type=request.analysis_type,
+            success=True,
+            processing_time_ms=(time.time() - start_time) * 1000,
+            user_id=user_id,
+            request_id=request_id
+        )
+        
+        return ORJSONResponse([result.model_dump() for result in results])
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        api_logger.log_analysis_complete(
+            analysis_type=request.analysis_type,
+            success=False,
+            processing_time_ms=(time.time() - start_time) * 1000,
+            user_id=user_id,
+            request_id=request_id,
+            error_message=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        api_logger.log_analysis_complete(
+            analysis_type=request.analysis_type,
+            success=False,
+            processing_time_ms=(time.time() - start_time) * 1000,
+            user_id=user_id,
+            request_id=request_id,
+            error_message=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch analysis failed: {str(e)}"
+        )
+
+
 @router.post("/analyze_multivariate", response_model=MultivariateResult)
 async def analyze_multivariate(
     request: MultivariateAnalysisRequest,
@@ -171,14 +287,21 @@ async def analyze_multivariate(
                 detail=detail
             )
         
-        # Convert to DataFrame
-        df = pd.DataFrame(request.data)
+        # Convert to DataFrame, keeping only the model variables
+        df = await run_in_threadpool(frame_from_records, request.data, [
+            request.outcome_variable,
+            *request.predictor_variables,
+            request.time_variable,
+            request.event_variable
+        ])
         
         # Initialize statistical service
-        stats_service = StatisticalAnalysisService()
+        stats_service = get_statistical_service()
         
-        # Perform multivariate analysis
-        result = stats_service.perform_multivariate_analysis(
+        # Perform multivariate analysis; it draws the forest plot, so it runs on
+        # the figure rendering thread
+        result = await run_in_render_thread(
+            stats_service.perform_multivariate_analysis,
             df=df,
             outcome_var=request.outcome_variable,
             predictor_vars=request.predictor_variables,
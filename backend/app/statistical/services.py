@@ -5,22 +5,114 @@ import numpy as np
 import scipy.stats as stats
 import statsmodels.api as sm
 import statsmodels.formula.api as smf
-from lifelines import KaplanMeierFitter, CoxPHFitter
+from lifelines import CoxPHFitter
 from lifelines.statistics import logrank_test
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union, Iterable
 import warnings
+from bisect import bisect_right
+from functools import lru_cache
 
+from .kernels import crosstab_counts, km_median
 from .models import StatisticalResult, MultivariateResult
-from ..visualization.services import PublicationVizService
+from ..visualization.services import PublicationVizService, get_viz_service
 
 warnings.filterwarnings('ignore')
 
+# Variance ratio above which the t-test no longer assumes equal variances
+_WELCH_VARIANCE_RATIO = 2.0
+
+# Above this combined size the Mann-Whitney p-value comes from the normal approximation
+_MWU_EXACT_MAX_N = 50
+
+# Text event codes read as "event occurred"; anything else counts as censored
+_EVENT_LABELS = np.array(['1', 'true', 'yes', 'dead', 'death', 'event', 'deceased'])
+
+# Significance thresholds and their interpretations, including the catch-all for
+# p-values at or above the last threshold
+_P_VALUE_THRESHOLDS = (0.001, 0.01, 0.05)
+_P_VALUE_INTERPRETATIONS = (
+    "Highly significant (p < 0.001)",
+    "Very significant (p < 0.01)",
+    "Significant (p < 0.05)",
+    "Not significant (p ≥ 0.05)",
+)
+
+
+# Tests that treat the outcome as a continuous measurement
+NUMERIC_OUTCOME_TESTS = frozenset({"independent_ttest", "one_way_anova", "mann_whitney_u"})
+
+
+def frame_from_records(data: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
+                       columns: List[Optional[str]],
+                       numeric: Iterable[Optional[str]] = ()) -> pd.DataFrame:
+    """Build a DataFrame holding only the requested columns of a request payload
+
+    Analysis requests usually carry the whole uploaded dataset while a test only
+    touches two or three variables, so the unused columns are never materialized.
+    ``data`` is either a list of row dicts or a columnar ``{column: values}``
+    mapping. Columns the payload does not contain are left out, as
+    ``pd.DataFrame(data)`` would. Columns listed in ``numeric`` are parsed to
+    numbers while the frame is built, with unparseable values becoming NaN.
+    """
+    columns = [col for col in dict.fromkeys(columns) if col]
+    numeric = set(numeric)
+    if isinstance(data, dict):
+        columns = [col for col in columns if col in data]
+        values = {col: data[col] for col in columns}
+    else:
+        columns = [col for col in columns if any(col in row for row in data)]
+        values = {col: [row.get(col) for row in data] for col in columns}
+    
+    return pd.DataFrame({
+        col: pd.to_numeric(values[col], errors='coerce') if col in numeric else values[col]
+        for col in columns
+    })
+
+
+def _as_f64(values: pd.Series) -> np.ndarray:
+    """Contiguous float64 array of a numeric column, copying only when the column
+    is not already stored that way"""
+    return np.ascontiguousarray(values.to_numpy(), dtype=np.float64)
+
+
+@lru_cache(maxsize=2048)
+def _t_critical_975(df_val: int) -> float:
+    """Two-sided 95% critical value of Student's t for integer degrees of freedom"""
+    return float(stats.t.ppf(0.975, df_val))
+
+
+def _describe_group(values: np.ndarray) -> Tuple[int, float, float]:
+    """Size, mean and sample standard deviation of one group, shared by the test
+    statistic and the descriptive statistics in the response"""
+    n = len(values)
+    mean = values.mean()
+    deviations = values - mean
+    std = np.sqrt(np.dot(deviations, deviations) / (n - 1)) if n > 1 else np.nan
+    return n, mean, std
+
+
+def _split_groups(values: np.ndarray, labels: pd.Series) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Split ``values`` by group label with a single pass over the group column
+
+    Labels are factorized once and the values sorted by group code, so each
+    group becomes a contiguous slice instead of a boolean-mask copy. Groups are
+    returned in order of first appearance, matching ``Series.unique()``.
+    """
+    codes, uniques = pd.factorize(labels)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    ordered = values[order]
+    return uniques, [ordered[bounds[i]:bounds[i + 1]] for i in range(len(uniques))]
+
 
 class StatisticalAnalysisService:
     """Service for statistical analysis operations"""
     
-    def __init__(self):
-        self.viz_service = PublicationVizService()
+    @property
+    def viz_service(self) -> PublicationVizService:
+        """Shared visualization service, looked up on use so that plain tests never
+        touch the global matplotlib style"""
+        return get_viz_service()
     
     def perform_analysis(self, df: pd.DataFrame, analysis_type: str, 
                         outcome_var: str, group_var: str, 
@@ -53,6 +145,24 @@ class StatisticalAnalysisService:
         else:
             raise ValueError(f"Unsupported analysis type: {analysis_type}")
     
+    def perform_batch_analysis(self, df: pd.DataFrame, analysis_type: str,
+                               outcome_vars: List[str], group_var: str) -> List[StatisticalResult]:
+        """Run the same two-variable test for each outcome against one grouping"""
+        if analysis_type == "survival_analysis":
+            raise ValueError("Batch analysis does not support survival analysis")
+        if not outcome_vars:
+            raise ValueError("Batch analysis requires at least one outcome variable")
+        missing = [var for var in dict.fromkeys([*outcome_vars, group_var]) if var not in df.columns]
+        if missing:
+            raise ValueError(f"Variables not found in data: {missing}")
+        if group_var in outcome_vars:
+            raise ValueError("Outcome variable cannot be the grouping variable")
+        
+        return [
+            self.perform_analysis(df[[outcome_var, group_var]], analysis_type, outcome_var, group_var)
+            for outcome_var in outcome_vars
+        ]
+    
     def perform_multivariate_analysis(
         self, df: pd.DataFrame, outcome_var: str, predictor_vars: List[str],
         model_type: Optional[str] = None, time_var: Optional[str] = None,
@@ -128,71 +238,92 @@ class StatisticalAnalysisService:
         
         # Convert outcome variable to numeric, handling string data
         try:
-            outcome_numeric = pd.to_numeric(df[outcome_var], errors='coerce')
-            df_clean = df.copy()
-            df_clean[outcome_var] = outcome_numeric
-            df_clean = df_clean.dropna(subset=[outcome_var])
+            outcome = _as_f64(pd.to_numeric(df[outcome_var], errors='coerce'))
+            valid = ~np.isnan(outcome)
             
-            if len(df_clean) == 0:
+            if not valid.any():
                 raise ValueError(f"No valid numeric data found in outcome variable '{outcome_var}'")
                 
         except Exception as e:
             raise ValueError(f"Cannot convert outcome variable '{outcome_var}' to numeric: {str(e)}")
         
-        group1_data = df_clean[df_clean[group_var] == groups[0]][outcome_var].astype(float)
-        group2_data = df_clean[df_clean[group_var] == groups[1]][outcome_var].astype(float)
+        groups, group_data = _split_groups(outcome[valid], df[group_var][valid])
+        if len(groups) != 2:
+            raise ValueError("T-test requires numeric outcome data in both groups")
+        
+        (n1, mean1, std1), (n2, mean2, std2) = (_describe_group(data) for data in group_data)
+        
+        # Fall back to Welch's t-test when the group variances clearly differ
+        var1, var2 = std1 ** 2, std2 ** 2
+        welch = max(var1, var2) > _WELCH_VARIANCE_RATIO * min(var1, var2)
         
-        # Perform t-test
-        statistic, p_value = stats.ttest_ind(group1_data, group2_data)
+        # Perform t-test from the group moments
+        statistic, p_value = stats.ttest_ind_from_stats(mean1, std1, n1, mean2, std2, n2, equal_var=not welch)
         
         # Calculate effect size (Cohen's d)
-        pooled_std = np.sqrt(((len(group1_data) - 1) * group1_data.var() + 
-                             (len(group2_data) - 1) * group2_data.var()) / 
-                            (len(group1_data) + len(group2_data) - 2))
-        cohens_d = (group1_data.mean() - group2_data.mean()) / pooled_std
+        pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
+        mean_diff = mean1 - mean2
+        cohens_d = mean_diff / pooled_std
         
         # Confidence interval for mean difference
-        se_diff = pooled_std * np.sqrt(1/len(group1_data) + 1/len(group2_data))
-        df_val = len(group1_data) + len(group2_data) - 2
-        t_critical = stats.t.ppf(0.975, df_val)
-        mean_diff = group1_data.mean() - group2_data.mean()
+        if welch:
+            se_diff = np.sqrt(var1/n1 + var2/n2)
+            df_val = se_diff ** 4 / ((var1/n1) ** 2 / (n1 - 1) + (var2/n2) ** 2 / (n2 - 1))
+            t_critical = stats.t.ppf(0.975, df_val)
+            df_label = f"{df_val:.1f}"
+        else:
+            se_diff = pooled_std * np.sqrt(1/n1 + 1/n2)
+            df_val = n1 + n2 - 2
+            t_critical = _t_critical_975(df_val)
+            df_label = str(df_val)
         ci_lower = mean_diff - t_critical * se_diff
         ci_upper = mean_diff + t_critical * se_diff
         
-        return StatisticalResult(
-            test_name="Independent Samples T-Test",
+        return StatisticalResult.model_construct(
+            test_name="Welch's T-Test" if welch else "Independent Samples T-Test",
             statistic=float(statistic),
             p_value=float(p_value),
             effect_size={"name": "Cohen's d", "value": float(cohens_d)},
             confidence_interval=[float(ci_lower), float(ci_upper)],
-            summary=f"t({df_val}) = {statistic:.3f}, p = {p_value:.3f}",
+            summary=f"t({df_label}) = {statistic:.3f}, p = {p_value:.3f}",
             interpretation=self._get_p_value_interpretation(p_value),
             assumptions_met=True,
-            sample_sizes={str(groups[0]): len(group1_data), str(groups[1]): len(group2_data)},
+            sample_sizes={str(groups[0]): n1, str(groups[1]): n2},
             descriptive_stats={
-                str(groups[0]): {"mean": float(group1_data.mean()), "std": float(group1_data.std())},
-                str(groups[1]): {"mean": float(group2_data.mean()), "std": float(group2_data.std())}
+                str(groups[0]): {"mean": float(mean1), "std": float(std1)},
+                str(groups[1]): {"mean": float(mean2), "std": float(std2)}
             }
         )
     
     def _perform_anova(self, df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
         """Perform one-way ANOVA"""
-        groups = df[group_var].unique()
-        group_data = [df[df[group_var] == group][outcome_var].astype(float) for group in groups]
-        
-        # Perform ANOVA
-        statistic, p_value = stats.f_oneway(*group_data)
+        groups, group_data = _split_groups(_as_f64(df[outcome_var]), df[group_var])
+        if len(groups) < 2:
+            raise ValueError("ANOVA requires at least 2 groups")
         
-        # Calculate eta squared (effect size)
-        ss_between = sum(len(group) * (group.mean() - df[outcome_var].mean())**2 for group in group_data)
-        ss_total = ((df[outcome_var].astype(float) - df[outcome_var].astype(float).mean())**2).sum()
-        eta_squared = ss_between / ss_total
+        sizes, means, stds = (np.array(col, dtype=float) for col in zip(*map(_describe_group, group_data)))
         
         # Degrees of freedom
         df_between = len(groups) - 1
         df_within = len(df) - len(groups)
         
-        return StatisticalResult(
+        # Perform ANOVA from the group moments: SS_between from the G group means
+        # around the grand mean, SS_within from each group's own deviations so a
+        # single-member group adds 0 instead of its undefined (NaN) variance
+        grand_mean = np.dot(sizes, means) / sizes.sum()
+        ss_between = np.dot(sizes, (means - grand_mean) ** 2)
+        ss_within = 0.0
+        for values, mean in zip(group_data, means):
+            deviations = values - mean
+            ss_within += np.dot(deviations, deviations)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            statistic = (ss_between / df_between) / (ss_within / df_within)
+        p_value = stats.f.sf(statistic, df_between, df_within)
+        
+        # Calculate eta squared (effect size)
+        eta_squared = ss_between / (ss_between + ss_within)
+        
+        return StatisticalResult.model_construct(
             test_name="One-Way ANOVA",
             statistic=float(statistic),
             p_value=float(p_value),
@@ -201,24 +332,25 @@ class StatisticalAnalysisService:
             summary=f"F({df_between}, {df_within}) = {statistic:.3f}, p = {p_value:.3f}",
             interpretation=self._get_p_value_interpretation(p_value),
             assumptions_met=True,
-            sample_sizes={str(group): len(data) for group, data in zip(groups, group_data)},
+            sample_sizes={str(group): int(n) for group, n in zip(groups, sizes)},
             descriptive_stats={
-                str(group): {"mean": float(data.mean()), "std": float(data.std())} 
-                for group, data in zip(groups, group_data)
+                str(group): {"mean": float(mean), "std": float(std)} 
+                for group, mean, std in zip(groups, means, stds)
             }
         )
     
     def _perform_chi_square(self, df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
         """Perform chi-square test of independence"""
-        contingency_table = pd.crosstab(df[outcome_var], df[group_var])
+        contingency_table, outcome_levels, group_levels = crosstab_counts(df[outcome_var], df[group_var])
         
         chi2, p_value, dof, expected = stats.chi2_contingency(contingency_table)
         
         # Calculate Cramér's V
-        n = contingency_table.sum().sum()
+        n = contingency_table.sum()
         cramers_v = np.sqrt(chi2 / (n * (min(contingency_table.shape) - 1)))
+        group_totals = contingency_table.sum(axis=0)
         
-        return StatisticalResult(
+        return StatisticalResult.model_construct(
             test_name="Chi-Square Test of Independence",
             statistic=float(chi2),
             p_value=float(p_value),
@@ -226,27 +358,32 @@ class StatisticalAnalysisService:
             confidence_interval=None,
             summary=f"χ²({dof}) = {chi2:.3f}, p = {p_value:.3f}",
             interpretation=self._get_p_value_interpretation(p_value),
-            assumptions_met=all(expected.values.flatten() >= 5),
-            sample_sizes=contingency_table.sum(axis=0).to_dict(),
-            descriptive_stats=contingency_table.to_dict()
+            assumptions_met=bool(np.all(expected >= 5)),
+            sample_sizes={str(group): int(total) for group, total in zip(group_levels, group_totals)},
+            descriptive_stats={
+                str(group): {str(outcome): int(count) for outcome, count in zip(outcome_levels, contingency_table[:, j])}
+                for j, group in enumerate(group_levels)
+            }
         )
     
     def _perform_mann_whitney(self, df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
         """Perform Mann-Whitney U test"""
-        groups = df[group_var].unique()
+        groups, group_data = _split_groups(_as_f64(df[outcome_var]), df[group_var])
         if len(groups) != 2:
             raise ValueError("Mann-Whitney U test requires exactly 2 groups")
         
-        group1_data = df[df[group_var] == groups[0]][outcome_var].astype(float)
-        group2_data = df[df[group_var] == groups[1]][outcome_var].astype(float)
+        group1_data, group2_data = group_data
+        q1_25, q1_50, q1_75 = np.percentile(group1_data, [25, 50, 75])
+        q2_25, q2_50, q2_75 = np.percentile(group2_data, [25, 50, 75])
         
-        statistic, p_value = stats.mannwhitneyu(group1_data, group2_data, alternative='two-sided')
+        n1, n2 = len(group1_data), len(group2_data)
+        method = 'asymptotic' if n1 + n2 > _MWU_EXACT_MAX_N else 'auto'
+        statistic, p_value = stats.mannwhitneyu(group1_data, group2_data, alternative='two-sided', method=method)
         
         # Calculate effect size (rank-biserial correlation)
-        n1, n2 = len(group1_data), len(group2_data)
         r = 1 - (2 * statistic) / (n1 * n2)
         
-        return StatisticalResult(
+        return StatisticalResult.model_construct(
             test_name="Mann-Whitney U Test",
             statistic=float(statistic),
             p_value=float(p_value),
@@ -257,15 +394,15 @@ class StatisticalAnalysisService:
             assumptions_met=True,
             sample_sizes={str(groups[0]): len(group1_data), str(groups[1]): len(group2_data)},
             descriptive_stats={
-                str(groups[0]): {"median": float(group1_data.median()), "iqr": float(group1_data.quantile(0.75) - group1_data.quantile(0.25))},
-                str(groups[1]): {"median": float(group2_data.median()), "iqr": float(group2_data.quantile(0.75) - group2_data.quantile(0.25))}
+                str(groups[0]): {"median": float(q1_50), "iqr": float(q1_75 - q1_25)},
+                str(groups[1]): {"median": float(q2_50), "iqr": float(q2_75 - q2_25)}
             }
         )
     
     def _perform_survival_analysis(self, df: pd.DataFrame, time_var: str, event_var: str, group_var: str) -> StatisticalResult:
         """Perform Kaplan-Meier survival analysis"""
         # Implementation similar to the original function but with better error handling
-        clean_df = df[[time_var, event_var, group_var]].copy().dropna()
+        clean_df = df[[time_var, event_var, group_var]].dropna()
         
         # Convert time to numeric
         time_data = pd.to_numeric(clean_df[time_var], errors='coerce')
@@ -280,37 +417,28 @@ class StatisticalAnalysisService:
             event_data = event_data.astype(int)
         else:
             # Handle text patterns
-            event_mapping = {}
-            for val in unique_events:
-                str_val = str(val).lower().strip()
-                if str_val in ['1', 'true', 'yes', 'dead', 'death', 'event', 'deceased']:
-                    event_mapping[val] = 1
-                else:
-                    event_mapping[val] = 0
-            event_data = event_data.map(event_mapping).fillna(0).astype(int)
+            labels = np.char.lower(np.char.strip(event_data.to_numpy().astype(str)))
+            event_data = pd.Series(np.isin(labels, _EVENT_LABELS).astype(int), index=event_data.index)
         
         # Remove invalid values
-        valid_mask = ~time_data.isna()
-        time_data = time_data[valid_mask]
-        event_data = event_data[valid_mask]
-        clean_df = clean_df[valid_mask].reset_index(drop=True)
+        time_data = _as_f64(time_data)
+        valid_mask = ~np.isnan(time_data)
         
-        groups = clean_df[group_var].unique()
+        # Each group is a contiguous (time, event) block of the data sorted by group code
+        survival_rows = np.column_stack((time_data, event_data.to_numpy(dtype=np.float64)))[valid_mask]
+        groups, group_rows = _split_groups(survival_rows, clean_df[group_var][valid_mask])
         group_stats = {}
         survival_data = {}
         
-        for group in groups:
-            mask = clean_df[group_var] == group
-            group_time = time_data[mask].values
-            group_event = event_data[mask].values
+        for group, rows in zip(groups, group_rows):
+            group_time, group_event = rows[:, 0], rows[:, 1]
             
-            kmf = KaplanMeierFitter()
-            kmf.fit(group_time, group_event, label=str(group))
+            median_survival = km_median(group_time, group_event)
             
             group_stats[str(group)] = {
                 "sample_size": len(group_event),
                 "events": int(group_event.sum()),
-                "median_survival": float(kmf.median_survival_time_) if kmf.median_survival_time_ != np.inf else None
+                "median_survival": median_survival if np.isfinite(median_survival) else None
             }
             
             survival_data[str(group)] = {
@@ -337,7 +465,7 @@ class StatisticalAnalysisService:
         # Format sample sizes
         sample_sizes_formatted = {group: stats["sample_size"] for group, stats in group_stats.items()}
         
-        return StatisticalResult(
+        return StatisticalResult.model_construct(
             test_name="Kaplan-Meier Survival Analysis",
             statistic=test_statistic,
             p_value=p_value,
@@ -561,24 +689,26 @@ class StatisticalAnalysisService:
         if time_var and event_var:
             return 'cox'
         
-        outcome_data = df[outcome_var].dropna()
-        unique_values = outcome_data.nunique()
+        outcome_data = df[outcome_var]
         
-        if unique_values == 2:
+        # Non-numeric outcomes are logistic whatever their level count, so only
+        # numeric ones need the value scan (nunique already skips NaN)
+        if not pd.api.types.is_numeric_dtype(outcome_data):
             return 'logistic'
         
-        if pd.api.types.is_numeric_dtype(outcome_data):
-            return 'linear'
+        if outcome_data.nunique() == 2:
+            return 'logistic'
         
-        return 'logistic'
+        return 'linear'
     
     def _get_p_value_interpretation(self, p_value: float) -> str:
         """Get interpretation of p-value"""
-        if p_value < 0.001:
-            return "Highly significant (p < 0.001)"
-        elif p_value < 0.01:
-            return "Very significant (p < 0.01)"
-        elif p_value < 0.05:
-            return "Significant (p < 0.05)"
-        else:
-            return "Not significant (p ≥ 0.05)" 
\ No newline at end of file
+        # bisect_right keeps the strict p < threshold comparisons; NaN falls through
+        # to "Not significant"
+        return _P_VALUE_INTERPRETATIONS[bisect_right(_P_VALUE_THRESHOLDS, p_value)] 
+
+
+@lru_cache(maxsize=1)
+def get_statistical_service() -> StatisticalAnalysisService:
+    """Shared statistical analysis service; it holds no per-request state"""
+    return StatisticalAnalysisService()
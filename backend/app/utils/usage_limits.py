@@ -51,20 +51,22 @@ class UsageLimiter:
         self, 
         request: Request, 
         feature_type: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        amount: int = 1
     ) -> bool:
         """
         Check if user has reached usage limit and increment count if allowed.
+        ``amount`` uses are charged at once, all or nothing.
         Returns True if usage is allowed, False if limit reached.
         """
         if user_id:
             # Handle authenticated users
-            return await self._check_user_usage(user_id, feature_type)
+            return await self._check_user_usage(user_id, feature_type, amount)
         else:
             # Handle anonymous users
-            return await self._check_anonymous_usage(request, feature_type)
+            return await self._check_anonymous_usage(request, feature_type, amount)
     
-    async def _check_user_usage(self, user_id: str, feature_type: str) -> bool:
+    async def _check_user_usage(self, user_id: str, feature_type: str, amount: int = 1) -> bool:
         """Check usage limits for authenticated users"""
         if feature_type not in self.LIMITS['authenticated']:
             logger.error(f"Invalid feature type: {feature_type}")
@@ -86,22 +88,25 @@ class UsageLimiter:
                 current_count = usage_record['usage_count']
                 
                 # Check if limit reached
-                if current_count >= limit:
+                if current_count + amount > limit:
                     logger.info(f"Usage limit reached for user {user_id}, feature {feature_type}")
                     return False
                 
                 # Increment usage count
                 self.admin_db.table('user_usage').update({
-                    'usage_count': current_count + 1,
+                    'usage_count': current_count + amount,
                     'last_used': current_time.isoformat()
                 }).eq('user_id', user_id).eq('feature_type', feature_type).execute()
                 
             else:
                 # First time using this feature - create new record
+                if amount > limit:
+                    logger.info(f"Usage limit reached for user {user_id}, feature {feature_type}")
+                    return False
                 self.admin_db.table('user_usage').insert({
                     'user_id': user_id,
                     'feature_type': feature_type,
-                    'usage_count': 1,
+                    'usage_count': amount,
                     'first_used': current_time.isoformat(),
                     'last_used': current_time.isoformat()
                 }).execute()
@@ -113,7 +118,7 @@ class UsageLimiter:
             # In case of error, allow the request but log it
             return True
     
-    async def _check_anonymous_usage(self, request: Request, feature_type: str) -> bool:
+    async def _check_anonymous_usage(self, request: Request, feature_type: str, amount: int = 1) -> bool:
         """Check usage limits for anonymous users"""
         if feature_type not in self.LIMITS['anonymous']:
             logger.error(f"Invalid feature type: {feature_type}")
@@ -139,21 +144,24 @@ class UsageLimiter:
                 # No daily reset - usage limits are permanent until manually reset
                 
                 # Check if limit reached
-                if current_count >= limit:
+                if current_count + amount > limit:
                     logger.info(f"Usage limit reached for IP {ip_address}, feature {feature_type}")
                     return False
                 # Increment usage count
                 self.admin_db.table('anonymous_usage').update({
-                    'usage_count': current_count + 1,
+                    'usage_count': current_count + amount,
                     'last_used': current_time.isoformat()
                 }).eq('ip_address', ip_address).eq('feature_type', feature_type).execute()
                 
             else:
                 # First time using this feature - create new record
+                if amount > limit:
+                    logger.info(f"Usage limit reached for IP {ip_address}, feature {feature_type}")
+                    return False
                 self.admin_db.table('anonymous_usage').insert({
                     'ip_address': ip_address,
                     'feature_type': feature_type,
-                    'usage_count': 1,
+                    'usage_count': amount,
                     'first_used': current_time.isoformat(),
                     'last_used': current_time.isoformat()
                 }).execute()
@@ -1,23 +1,29 @@
 """Visualization routes"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
+import numpy as np
 import pandas as pd
 
-from .services import PublicationVizService
+from .services import PublicationVizService, render_figure
 from ..auth.dependencies import get_optional_user
 from ..auth.models import UserResponse
 from ..statistical.models import AnalysisRequest, MultivariateAnalysisRequest
+from ..statistical.services import frame_from_records
 from .templates import template_library, FigureTemplate, TemplateCategory
 from .ai_suggestions import ai_plot_suggestor, AnalysisGoal
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/visualization", tags=["visualization"])
 
+# Lower-cased column names that mark survival time and event columns
+_TIME_COLUMN_NAMES = frozenset({'time', 'days', 'months', 'years', 'duration', 'followup', 'follow_up'})
+_EVENT_COLUMN_NAMES = frozenset({'event', 'status', 'death', 'deceased', 'outcome', 'censored'})
+
 
 class PublicationFigureRequest(BaseModel):
     """Publication figure request model"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -30,7 +36,7 @@ class PublicationFigureRequest(BaseModel):
 
 class DisplayFigureRequest(BaseModel):
     """Display figure request model"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -42,7 +48,7 @@ class DisplayFigureRequest(BaseModel):
 
 class CodeEditFigureRequest(BaseModel):
     """Code editable figure request model"""
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]  # row records or {column: values}
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -54,6 +60,19 @@ class CodeEditFigureRequest(BaseModel):
     format: str = "png"
 
 
+def _figure_frame(request) -> pd.DataFrame:
+    """Build the DataFrame for a figure request from the columns it plots"""
+    if request.analysis_type == "correlation_analysis":
+        # Correlation heatmaps use every numeric column in the dataset
+        return pd.DataFrame(request.data)
+    return frame_from_records(request.data, [
+        request.outcome_variable,
+        request.group_variable,
+        request.time_variable,
+        request.event_variable
+    ])
+
+
 @router.post("/generate_publication_figure")
 async def generate_publication_figure(
     request: PublicationFigureRequest,
@@ -61,7 +80,7 @@ async def generate_publication_figure(
 ):
     """Generate publication-ready figure using advanced visualization engine"""
     try:
-        df = pd.DataFrame(request.data)
+        df = _figure_frame(request)
         
         # Clean data based on analysis type
         if request.analysis_type == "survival_analysis":
@@ -74,14 +93,13 @@ async def generate_publication_figure(
         else:
             df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
-        # Initialize visualization service
+        # Journal style for the visualization service
         settings = request.publication_settings or {}
         style = settings.get('journal_style', 'nature')
-        viz_service = PublicationVizService(style=style)
         
         # Generate figure based on analysis type
         if request.analysis_type in ["independent_ttest", "mann_whitney_u", "one_way_anova"]:
-            figure_b64 = viz_service.create_publication_boxplot(
+            figure_b64 = await render_figure(style, PublicationVizService.create_publication_boxplot,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -91,7 +109,7 @@ async def generate_publication_figure(
             )
         
         elif request.analysis_type == "survival_analysis":
-            figure_b64 = viz_service.create_kaplan_meier_plot(
+            figure_b64 = await render_figure(style, PublicationVizService.create_kaplan_meier_plot,
                 data=df,
                 time_var=request.time_variable,
                 event_var=request.event_variable,
@@ -109,7 +127,7 @@ async def generate_publication_figure(
                     detail="Insufficient numeric variables for correlation analysis"
                 )
             
-            figure_b64 = viz_service.create_correlation_heatmap(
+            figure_b64 = await render_figure(style, PublicationVizService.create_correlation_heatmap,
                 data=df,
                 variables=numeric_vars[:10],
                 method='pearson',
@@ -117,7 +135,7 @@ async def generate_publication_figure(
             )
         
         elif request.analysis_type == "chi_square":
-            figure_b64 = viz_service.create_contingency_heatmap(
+            figure_b64 = await render_figure(style, PublicationVizService.create_contingency_heatmap,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -128,7 +146,7 @@ async def generate_publication_figure(
         
         else:
             # Default to box plot
-            figure_b64 = viz_service.create_publication_boxplot(
+            figure_b64 = await render_figure(style, PublicationVizService.create_publication_boxplot,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -151,7 +169,7 @@ async def generate_publication_figure(
         print(f"ERROR in generate_publication_figure: {str(e)}")
         print(f"ERROR traceback: {error_traceback}")
         print(f"Request data: analysis_type={request.analysis_type}, format={request.format}")
-        if hasattr(request, 'data') and request.data:
+        if isinstance(request.data, list) and request.data:
             print(f"Data sample: {str(request.data[:2])}")  # Show first 2 rows
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -166,10 +184,9 @@ async def generate_display_figure(
 ):
     """Generate publication-ready figure for display in the web interface"""
     try:
-        print(f"DEBUG: Received request with data length: {len(request.data)}")
         print(f"DEBUG: Analysis type: {request.analysis_type}")
         
-        df = pd.DataFrame(request.data)
+        df = _figure_frame(request)
         print(f"DEBUG: Initial DataFrame shape: {df.shape}")
         
         if df.empty:
@@ -206,9 +223,6 @@ async def generate_display_figure(
         else:
             df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
-        # Initialize visualization service
-        viz_service = PublicationVizService(style=request.journal_style)
-        
         # Determine visualization based on analysis type
         groups = df[request.group_variable].unique()
         n_groups = len(groups)
@@ -216,7 +230,7 @@ async def generate_display_figure(
         
         # Generate figure based on analysis type
         if request.analysis_type in ["independent_ttest", "mann_whitney_u", "one_way_anova"]:
-            figure_b64 = viz_service.create_publication_boxplot(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_publication_boxplot,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -226,7 +240,7 @@ async def generate_display_figure(
             
         elif request.analysis_type in ["survival_analysis", "kaplan_meier"]:
             print(f"DEBUG: Calling create_kaplan_meier_plot with cleaned data")
-            figure_b64 = viz_service.create_kaplan_meier_plot(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_kaplan_meier_plot,
                 data=df,
                 time_var=request.time_variable,
                 event_var=request.event_variable,
@@ -239,7 +253,7 @@ async def generate_display_figure(
             numeric_vars = df.select_dtypes(include=['number']).columns.tolist()
             if len(numeric_vars) < 2:
                 # Fallback to box plot
-                figure_b64 = viz_service.create_publication_boxplot(
+                figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_publication_boxplot,
                     data=df,
                     outcome_var=request.outcome_variable,
                     group_var=request.group_variable,
@@ -247,7 +261,7 @@ async def generate_display_figure(
                     custom_labels=request.custom_labels
                 )
             else:
-                figure_b64 = viz_service.create_correlation_heatmap(
+                figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_correlation_heatmap,
                     data=df,
                     variables=numeric_vars[:8],
                     method='pearson',
@@ -255,7 +269,7 @@ async def generate_display_figure(
                 )
                 
         elif request.analysis_type == "chi_square":
-            figure_b64 = viz_service.create_contingency_heatmap(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_contingency_heatmap,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -265,7 +279,7 @@ async def generate_display_figure(
             
         else:
             # Default visualization - box plot
-            figure_b64 = viz_service.create_publication_boxplot(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_publication_boxplot,
                 data=df,
                 outcome_var=request.outcome_variable,
                 group_var=request.group_variable,
@@ -305,7 +319,7 @@ async def generate_code_edit_figure(
 ):
     """Generate figure with user-editable code parameters"""
     try:
-        df = pd.DataFrame(request.data)
+        df = _figure_frame(request)
         
         # Clean data based on analysis type
         if request.analysis_type == "survival_analysis":
@@ -318,11 +332,8 @@ async def generate_code_edit_figure(
         else:
             df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
-        # Initialize visualization service
-        viz_service = PublicationVizService(style=request.journal_style)
-        
         # Generate figure with custom code parameters
-        figure_b64 = viz_service.create_code_editable_figure(
+        figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_code_editable_figure,
             data=df,
             outcome_var=request.outcome_variable,
             group_var=request.group_variable,
@@ -441,9 +452,7 @@ async def generate_heatmap(
     try:
         df = pd.DataFrame(request.data)
         
-        viz_service = PublicationVizService(style=request.journal_style)
-        
-        figure_b64 = viz_service.create_heatmap(
+        figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_heatmap,
             data=df,
             x_var=request.x_var,
             y_var=request.y_var,
@@ -494,9 +503,7 @@ async def generate_volcano_plot(
     try:
         df = pd.DataFrame(request.data)
         
-        viz_service = PublicationVizService(style=request.journal_style)
-        
-        figure_b64 = viz_service.create_volcano_plot(
+        figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_volcano_plot,
             data=df,
             log2fc_col=request.log2fc_col,
             pvalue_col=request.pvalue_col,
@@ -546,9 +553,7 @@ async def generate_violin_plot(
         df = pd.DataFrame(request.data)
         df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
-        viz_service = PublicationVizService(style=request.journal_style)
-        
-        figure_b64 = viz_service.create_violin_plot(
+        figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_violin_plot,
             data=df,
             outcome_var=request.outcome_variable,
             group_var=request.group_variable,
@@ -593,8 +598,6 @@ async def generate_roc_curve(
     try:
         import numpy as np
         
-        viz_service = PublicationVizService(style=request.journal_style)
-        
         if request.multi_class:
             # Convert multi_class dict to proper format
             multi_class_data = {}
@@ -603,7 +606,7 @@ async def generate_roc_curve(
                 y_s = np.array(class_data['y_scores'])
                 multi_class_data[class_name] = (y_t, y_s)
             
-            figure_b64 = viz_service.create_roc_curve(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_roc_curve,
                 y_true=None,
                 y_scores=None,
                 title=request.title,
@@ -611,7 +614,7 @@ async def generate_roc_curve(
                 format_type=request.format
             )
         else:
-            figure_b64 = viz_service.create_roc_curve(
+            figure_b64 = await render_figure(request.journal_style, PublicationVizService.create_roc_curve,
                 y_true=np.array(request.y_true),
                 y_scores=np.array(request.y_scores),
                 title=request.title,
@@ -747,15 +750,9 @@ def analyze_data_characteristics(df: pd.DataFrame) -> Dict[str, Any]:
     })
     
     # Special column detection
-    characteristics["has_time_column"] = any(
-        col.lower() in ['time', 'days', 'months', 'years', 'duration', 'followup', 'follow_up']
-        for col in df.columns
-    )
-    
-    characteristics["has_event_column"] = any(
-        col.lower() in ['event', 'status', 'death', 'deceased', 'outcome', 'censored']
-        for col in df.columns
-    )
+    lowered_columns = {col.lower() for col in df.columns}
+    characteristics["has_time_column"] = not _TIME_COLUMN_NAMES.isdisjoint(lowered_columns)
+    characteristics["has_event_column"] = not _EVENT_COLUMN_NAMES.isdisjoint(lowered_columns)
     
     # Group analysis
     if categorical_cols:
@@ -771,11 +768,16 @@ def analyze_data_characteristics(df: pd.DataFrame) -> Dict[str, Any]:
     
     # Binary outcome detection
     if numeric_cols:
-        binary_cols = []
-        for col in numeric_cols:
-            unique_vals = df[col].dropna().unique()
-            if len(unique_vals) == 2 and set(unique_vals).issubset({0, 1, 0.0, 1.0}):
-                binary_cols.append(col)
+        # One pass over the numeric block: a column is binary when its non-missing
+        # values are all 0/1 and both occur
+        values = df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        is_zero = values == 0
+        is_one = values == 1
+        is_binary = (
+            (is_zero | is_one | np.isnan(values)).all(axis=0)
+            & is_zero.any(axis=0) & is_one.any(axis=0)
+        )
+        binary_cols = [col for col, binary in zip(numeric_cols, is_binary) if binary]
         characteristics["binary_columns"] = binary_cols
         characteristics["has_binary_outcome"] = len(binary_cols) > 0
     
@@ -1,13 +1,66 @@
 """Visualization services"""
 
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+import multiprocessing
+import asyncio
 import sys
 import os
 
 # Add the parent directory to path to import the original engine
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from publication_viz_engine import PublicationVizEngine
+from ..config.settings import settings
+
+# Matplotlib's pyplot state and the journal rcParams are process-global, so
+# in-process figure work runs on one dedicated thread instead of the event loop
+_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figure-render")
+
+# Standalone figures are drawn in worker processes, each with its own pyplot
+# state, so several can render in parallel
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+async def run_in_render_thread(func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Run a blocking call that draws figures on the rendering thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_render_executor, partial(func, *args, **kwargs))
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.render_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Stop the figure worker processes"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+def _draw_figure(style: str, method: Callable[..., str], kwargs: Dict[str, Any]) -> str:
+    return method(get_viz_service(style), **kwargs)
+
+
+async def render_figure(style: str, method: Callable[..., str], /, **kwargs) -> str:
+    """Draw a figure with a ``PublicationVizService`` method in a worker process
+
+    ``method`` and its arguments are pickled to the worker, which keeps its
+    own cached services and applies the journal style before drawing.
+    ``style`` and ``method`` are positional-only so drawing kwargs such as the
+    correlation heatmap's ``method='pearson'`` pass through untouched.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_render_pool(), _draw_figure, style, method, kwargs)
 
 
 class PublicationVizService:
@@ -168,4 +221,20 @@ class PublicationVizService:
             title=title,
             multi_class=multi_class,
             format_type=format_type
-        ) 
\ No newline at end of file
+        ) 
+
+
+@lru_cache(maxsize=8)
+def _cached_viz_service(style: str) -> PublicationVizService:
+    return PublicationVizService(style=style)
+
+
+def get_viz_service(style: str = 'nature') -> PublicationVizService:
+    """Shared visualization service for a journal style, with its style applied
+    
+    Services are cached per style instead of being rebuilt for every figure;
+    the matplotlib rcParams are only re-applied when the active style changes.
+    """
+    viz_service = _cached_viz_service(style)
+    viz_service.engine.apply_style()
+    return viz_service
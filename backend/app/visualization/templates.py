@@ -3,7 +3,8 @@ Figure Templates Library for SciFig AI
 Provides pre-configured templates for common scientific visualizations
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
 from pydantic import BaseModel
 from enum import Enum
 
@@ -333,28 +334,42 @@ class FigureTemplateLibrary:
         - has_binary_outcome
         - num_groups
         """
-        recommendations = []
-        
-        # Check for survival analysis
-        if data_shape.get('has_time_column') and data_shape.get('has_event_column'):
-            recommendations.append(self.templates.get('kaplan_meier_survival'))
-        
-        # Check for group comparisons
-        if data_shape.get('num_groups') == 2 and data_shape.get('num_numeric_cols') > 0:
-            recommendations.append(self.templates.get('two_group_comparison'))
-        elif data_shape.get('num_groups') > 2 and data_shape.get('num_numeric_cols') > 0:
-            recommendations.append(self.templates.get('multi_group_anova'))
-        
-        # Check for correlation analysis
-        if data_shape.get('num_numeric_cols', 0) >= 3:
-            recommendations.append(self.templates.get('correlation_matrix'))
-        
-        # Check for classification
-        if data_shape.get('has_binary_outcome') and data_shape.get('has_predictions'):
-            recommendations.append(self.templates.get('roc_auc_classifier'))
-        
-        # Filter out None values
-        return [t for t in recommendations if t is not None]
+        template_ids = _recommended_template_ids(
+            data_shape.get('has_time_column'),
+            data_shape.get('has_event_column'),
+            data_shape.get('num_groups'),
+            data_shape.get('num_numeric_cols'),
+            data_shape.get('has_binary_outcome'),
+            data_shape.get('has_predictions')
+        )
+        return [self.templates[t] for t in template_ids if t in self.templates]
+
+
+@lru_cache(maxsize=1024)
+def _recommended_template_ids(has_time_column, has_event_column, num_groups, num_numeric_cols,
+                              has_binary_outcome, has_predictions) -> Tuple[str, ...]:
+    """Template IDs recommended for one data profile, memoized since they only depend on these fields"""
+    recommendations = []
+    
+    # Check for survival analysis
+    if has_time_column and has_event_column:
+        recommendations.append('kaplan_meier_survival')
+    
+    # Check for group comparisons
+    if num_groups == 2 and num_numeric_cols > 0:
+        recommendations.append('two_group_comparison')
+    elif num_groups > 2 and num_numeric_cols > 0:
+        recommendations.append('multi_group_anova')
+    
+    # Check for correlation analysis
+    if (num_numeric_cols or 0) >= 3:
+        recommendations.append('correlation_matrix')
+    
+    # Check for classification
+    if has_binary_outcome and has_predictions:
+        recommendations.append('roc_auc_classifier')
+    
+    return tuple(recommendations)
 
 
 # Singleton instance
@@ -4,8 +4,9 @@ Simple statistical analysis server for SciFig AI
 Provides robust statistical computations using Python's scientific stack
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import pandas as pd
@@ -18,17 +19,22 @@ import seaborn as sns
 import base64
 import io
 import json
-from publication_viz_engine import PublicationVizEngine
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from publication_viz_engine import PublicationVizEngine, raw_figure_output
+from app.statistical.kernels import crosstab_counts, km_median
 
 # Advanced statistical modeling imports
 import statsmodels.api as sm
 import statsmodels.formula.api as smf
 from statsmodels.stats.outliers_influence import variance_inflation_factor
 from lifelines import CoxPHFitter
+from lifelines.statistics import logrank_test
 import warnings
 warnings.filterwarnings('ignore')
 
-app = FastAPI(title="SciFig AI Statistical Engine", version="1.0.0")
+app = FastAPI(title="SciFig AI Statistical Engine", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -39,8 +45,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@lru_cache(maxsize=8)
+def _cached_engine(style: str) -> PublicationVizEngine:
+    return PublicationVizEngine(style=style)
+
+def get_engine(style: str = 'nature') -> PublicationVizEngine:
+    """Return the shared engine for a journal style with its rcParams active"""
+    engine = _cached_engine(style)
+    engine.apply_style()
+    return engine
+
+# Recently generated figure responses, keyed by a hash of the endpoint and request
+FIGURE_CACHE_SIZE = 128
+_figure_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+def cache_figure_response(endpoint):
+    """Serve repeated identical figure requests from an in-process LRU cache"""
+    @wraps(endpoint)
+    async def wrapper(request: BaseModel):
+        key = hashlib.blake2b(
+            f"{endpoint.__name__}:{request.model_dump_json()}".encode(), digest_size=16
+        ).digest()
+        if key in _figure_cache:
+            _figure_cache.move_to_end(key)
+            return _figure_cache[key]
+        
+        result = await endpoint(request)
+        _figure_cache[key] = result
+        if len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+        return result
+    return wrapper
+
 class AnalysisRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: List[dict]  # row dicts; cell values are left to pandas
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -48,7 +86,7 @@ class AnalysisRequest(BaseModel):
     event_variable: Optional[str] = None
 
 class MultivariateAnalysisRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: List[dict]  # row dicts; cell values are left to pandas
     outcome_variable: str
     predictor_variables: List[str]  # Multiple covariates
     analysis_type: str = "multivariate_analysis"
@@ -311,19 +349,19 @@ def auto_detect_model_type(df: pd.DataFrame, outcome_var: str, time_var: Optiona
         return 'cox'
     
     # Check outcome variable type
-    outcome_data = df[outcome_var].dropna()
-    unique_values = outcome_data.nunique()
+    outcome_data = df[outcome_var]
     
-    # If binary outcome, use logistic regression
-    if unique_values == 2:
+    # Categorical outcomes use logistic regression whatever their level count,
+    # so the dtype decides before any scan of the values
+    if not pd.api.types.is_numeric_dtype(outcome_data):
         return 'logistic'
     
-    # If continuous outcome, use linear regression
-    if pd.api.types.is_numeric_dtype(outcome_data):
-        return 'linear'
+    # If binary outcome, use logistic regression (nunique skips NaN)
+    if outcome_data.nunique() == 2:
+        return 'logistic'
     
-    # Default to logistic for categorical outcomes
-    return 'logistic'
+    # Otherwise continuous, use linear regression
+    return 'linear'
 
 @app.get("/")
 async def root():
@@ -337,8 +375,18 @@ async def health():
 async def analyze_data(request: AnalysisRequest):
     """Perform statistical analysis on the provided data"""
     try:
-        # Convert to DataFrame
-        df = pd.DataFrame(request.data)
+        # Convert to DataFrame, keeping only the variables the test uses
+        needed = [request.outcome_variable, request.group_variable]
+        if request.analysis_type == "survival_analysis":
+            needed += [request.time_variable, request.event_variable]
+        needed = [col for col in dict.fromkeys(needed) if col]
+        df = pd.DataFrame([[row.get(col) for col in needed] for row in request.data], columns=needed)
+        
+        # Parse continuous variables up front instead of in every test
+        if request.analysis_type in ("independent_ttest", "one_way_anova", "mann_whitney_u"):
+            df[request.outcome_variable] = pd.to_numeric(df[request.outcome_variable], errors='coerce')
+        if request.time_variable in df:
+            df[request.time_variable] = pd.to_numeric(df[request.time_variable], errors='coerce')
         
         # Clean the data
         df = df.dropna(subset=[request.outcome_variable, request.group_variable])
@@ -420,7 +468,7 @@ async def analyze_multivariate(request: MultivariateAnalysisRequest):
             })
         
         # Generate forest plot
-        engine = PublicationVizEngine(style='nature')
+        engine = get_engine('nature')
         forest_plot_b64 = engine.create_multivariate_forest_plot(
             forest_data, 
             title=f"Multivariate {analysis_results['model_type'].replace('_', ' ').title()}",
@@ -445,78 +493,127 @@ async def analyze_multivariate(request: MultivariateAnalysisRequest):
         print(f"ERROR traceback: {error_traceback}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Variance ratio above which the t-test no longer assumes equal variances
+WELCH_VARIANCE_RATIO = 2.0
+
+# Above this combined size the Mann-Whitney p-value comes from the normal approximation
+MWU_EXACT_MAX_N = 50
+
+# Text event codes read as "event occurred"; anything else counts as censored
+EVENT_LABELS = np.array(['1', 'true', 'yes', 'dead', 'death', 'event', 'deceased'])
+
+def _grouped_outcome(df: pd.DataFrame, outcome_var: str, group_var: str):
+    """Coerce the outcome to float once and split it into per-group views
+    
+    Groups are factorized to integer codes in one scan and the outcome is
+    stably sorted by code, so each group is a contiguous slice.
+    """
+    outcome = pd.to_numeric(df[outcome_var], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(outcome)
+    codes, groups = pd.factorize(df[group_var].to_numpy()[valid])
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    outcome = outcome[valid][order]
+    arrays = [outcome[bounds[i]:bounds[i + 1]] for i in range(len(groups))]
+    return list(groups), arrays
+
+def _describe(values: np.ndarray) -> Dict[str, Any]:
+    """Size, mean, std, median and IQR of one group, with all quartiles from a single partial sort"""
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    return {
+        "n": values.size,
+        "mean": float(values.mean()),
+        "std": float(values.std(ddof=1)),
+        "median": float(median),
+        "iqr": float(q3 - q1)
+    }
+
 def perform_ttest(df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
     """Perform independent samples t-test"""
-    groups = df[group_var].unique()
-    if len(groups) != 2:
+    if df[group_var].nunique() != 2:
         raise ValueError("T-test requires exactly 2 groups")
     
     # Convert outcome variable to numeric, handling string data
-    try:
-        outcome_numeric = pd.to_numeric(df[outcome_var], errors='coerce')
-        df_clean = df.copy()
-        df_clean[outcome_var] = outcome_numeric
-        df_clean = df_clean.dropna(subset=[outcome_var])
-        
-        if len(df_clean) == 0:
-            raise ValueError(f"No valid numeric data found in outcome variable '{outcome_var}'")
-            
-    except Exception as e:
-        raise ValueError(f"Cannot convert outcome variable '{outcome_var}' to numeric: {str(e)}")
+    groups, arrays = _grouped_outcome(df, outcome_var, group_var)
+    if sum(len(a) for a in arrays) == 0:
+        raise ValueError(f"No valid numeric data found in outcome variable '{outcome_var}'")
+    if len(arrays) != 2:
+        raise ValueError("T-test requires exactly 2 groups")
     
-    group1_data = df_clean[df_clean[group_var] == groups[0]][outcome_var].astype(float)
-    group2_data = df_clean[df_clean[group_var] == groups[1]][outcome_var].astype(float)
+    a, b = arrays
+    n1, n2 = a.size, b.size
+    m1, m2 = a.mean(), b.mean()
+    v1, v2 = a.var(ddof=1), b.var(ddof=1)
+    
+    # Fall back to Welch's t-test when the group variances clearly differ
+    welch = max(v1, v2) > WELCH_VARIANCE_RATIO * min(v1, v2)
     
     # Perform t-test
-    statistic, p_value = stats.ttest_ind(group1_data, group2_data)
+    statistic, p_value = stats.ttest_ind(a, b, equal_var=not welch)
     
     # Calculate effect size (Cohen's d)
-    pooled_std = np.sqrt(((len(group1_data) - 1) * group1_data.var() + 
-                         (len(group2_data) - 1) * group2_data.var()) / 
-                        (len(group1_data) + len(group2_data) - 2))
-    cohens_d = (group1_data.mean() - group2_data.mean()) / pooled_std
+    pooled_std = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    mean_diff = m1 - m2
+    cohens_d = mean_diff / pooled_std
     
     # Confidence interval for mean difference
-    se_diff = pooled_std * np.sqrt(1/len(group1_data) + 1/len(group2_data))
-    df_val = len(group1_data) + len(group2_data) - 2
+    if welch:
+        se_diff = np.sqrt(v1/n1 + v2/n2)
+        df_val = se_diff**4 / ((v1/n1)**2 / (n1 - 1) + (v2/n2)**2 / (n2 - 1))
+        df_label = f"{df_val:.1f}"
+    else:
+        se_diff = pooled_std * np.sqrt(1/n1 + 1/n2)
+        df_val = n1 + n2 - 2
+        df_label = str(df_val)
     t_critical = stats.t.ppf(0.975, df_val)
-    mean_diff = group1_data.mean() - group2_data.mean()
     ci_lower = mean_diff - t_critical * se_diff
     ci_upper = mean_diff + t_critical * se_diff
     
     return StatisticalResult(
-        test_name="Independent Samples T-Test",
+        test_name="Welch's T-Test" if welch else "Independent Samples T-Test",
         statistic=float(statistic),
         p_value=float(p_value),
         effect_size={"name": "Cohen's d", "value": float(cohens_d)},
         confidence_interval=[float(ci_lower), float(ci_upper)],
-        summary=f"t({df_val}) = {statistic:.3f}, p = {p_value:.3f}",
+        summary=f"t({df_label}) = {statistic:.3f}, p = {p_value:.3f}",
         interpretation=get_p_value_interpretation(p_value),
         assumptions_met=True,  # Could add normality tests here
-        sample_sizes={str(groups[0]): len(group1_data), str(groups[1]): len(group2_data)},
+        sample_sizes={str(groups[0]): n1, str(groups[1]): n2},
         descriptive_stats={
-            str(groups[0]): {"mean": float(group1_data.mean()), "std": float(group1_data.std())},
-            str(groups[1]): {"mean": float(group2_data.mean()), "std": float(group2_data.std())}
+            str(groups[0]): {"mean": float(m1), "std": float(np.sqrt(v1))},
+            str(groups[1]): {"mean": float(m2), "std": float(np.sqrt(v2))}
         }
     )
 
 def perform_anova(df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
     """Perform one-way ANOVA"""
-    groups = df[group_var].unique()
-    group_data = [df[df[group_var] == group][outcome_var].astype(float) for group in groups]
+    y = pd.to_numeric(df[outcome_var], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(y)
+    y = y[valid]
+    codes, groups = pd.factorize(df[group_var].to_numpy()[valid])
+    
+    # Group sizes, means and within-group sums of squares in one bincount each
+    sizes = np.bincount(codes, minlength=len(groups))
+    means = np.bincount(codes, weights=y, minlength=len(groups)) / sizes
+    ss_groups = np.bincount(codes, weights=(y - means[codes])**2, minlength=len(groups))
+    
+    # Degrees of freedom
+    df_between = len(groups) - 1
+    df_within = len(y) - len(groups)
     
     # Perform ANOVA
-    statistic, p_value = stats.f_oneway(*group_data)
+    grand_mean = y.mean()
+    ss_between = float(np.dot(sizes, (means - grand_mean)**2))
+    ss_within = float(ss_groups.sum())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = (ss_between / df_between) / (ss_within / df_within)
+        stds = np.sqrt(ss_groups / (sizes - 1))
+    p_value = stats.f.sf(statistic, df_between, df_within)
     
     # Calculate eta squared (effect size)
-    ss_between = sum(len(group) * (group.mean() - df[outcome_var].mean())**2 for group in group_data)
-    ss_total = ((df[outcome_var].astype(float) - df[outcome_var].astype(float).mean())**2).sum()
+    ss_total = float(((y - grand_mean)**2).sum())
     eta_squared = ss_between / ss_total
     
-    # Degrees of freedom
-    df_between = len(groups) - 1
-    df_within = len(df) - len(groups)
-    
     return StatisticalResult(
         test_name="One-Way ANOVA",
         statistic=float(statistic),
@@ -526,22 +623,23 @@ def perform_anova(df: pd.DataFrame, outcome_var: str, group_var: str) -> Statist
         summary=f"F({df_between}, {df_within}) = {statistic:.3f}, p = {p_value:.3f}",
         interpretation=get_p_value_interpretation(p_value),
         assumptions_met=True,
-        sample_sizes={str(group): len(data) for group, data in zip(groups, group_data)},
+        sample_sizes={str(group): int(n) for group, n in zip(groups, sizes)},
         descriptive_stats={
-            str(group): {"mean": float(data.mean()), "std": float(data.std())} 
-            for group, data in zip(groups, group_data)
+            str(group): {"mean": float(mean), "std": float(std)}
+            for group, mean, std in zip(groups, means, stds)
         }
     )
 
 def perform_chi_square(df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
     """Perform chi-square test of independence"""
-    contingency_table = pd.crosstab(df[outcome_var], df[group_var])
+    contingency_table, outcome_levels, group_levels = crosstab_counts(df[outcome_var], df[group_var])
     
     chi2, p_value, dof, expected = stats.chi2_contingency(contingency_table)
     
     # Calculate Cramér's V
-    n = contingency_table.sum().sum()
+    n = contingency_table.sum()
     cramers_v = np.sqrt(chi2 / (n * (min(contingency_table.shape) - 1)))
+    group_totals = contingency_table.sum(axis=0)
     
     return StatisticalResult(
         test_name="Chi-Square Test of Independence",
@@ -551,24 +649,27 @@ def perform_chi_square(df: pd.DataFrame, outcome_var: str, group_var: str) -> St
         confidence_interval=None,
         summary=f"χ²({dof}) = {chi2:.3f}, p = {p_value:.3f}",
         interpretation=get_p_value_interpretation(p_value),
-        assumptions_met=all(expected.values.flatten() >= 5),
-        sample_sizes=contingency_table.sum(axis=0).to_dict(),
-        descriptive_stats=contingency_table.to_dict()
+        assumptions_met=bool(np.all(expected >= 5)),
+        sample_sizes={str(group): int(total) for group, total in zip(group_levels, group_totals)},
+        descriptive_stats={
+            str(group): {str(outcome): int(count) for outcome, count in zip(outcome_levels, contingency_table[:, j])}
+            for j, group in enumerate(group_levels)
+        }
     )
 
 def perform_mann_whitney(df: pd.DataFrame, outcome_var: str, group_var: str) -> StatisticalResult:
     """Perform Mann-Whitney U test"""
-    groups = df[group_var].unique()
+    groups, arrays = _grouped_outcome(df, outcome_var, group_var)
     if len(groups) != 2:
         raise ValueError("Mann-Whitney U test requires exactly 2 groups")
     
-    group1_data = df[df[group_var] == groups[0]][outcome_var].astype(float)
-    group2_data = df[df[group_var] == groups[1]][outcome_var].astype(float)
+    desc1, desc2 = (_describe(a) for a in arrays)
     
-    statistic, p_value = stats.mannwhitneyu(group1_data, group2_data, alternative='two-sided')
+    n1, n2 = desc1["n"], desc2["n"]
+    method = 'asymptotic' if n1 + n2 > MWU_EXACT_MAX_N else 'auto'
+    statistic, p_value = stats.mannwhitneyu(arrays[0], arrays[1], alternative='two-sided', method=method)
     
     # Calculate effect size (rank-biserial correlation)
-    n1, n2 = len(group1_data), len(group2_data)
     r = 1 - (2 * statistic) / (n1 * n2)
     
     return StatisticalResult(
@@ -580,21 +681,17 @@ def perform_mann_whitney(df: pd.DataFrame, outcome_var: str, group_var: str) ->
         summary=f"U = {statistic:.3f}, p = {p_value:.3f}",
         interpretation=get_p_value_interpretation(p_value),
         assumptions_met=True,
-        sample_sizes={str(groups[0]): len(group1_data), str(groups[1]): len(group2_data)},
+        sample_sizes={str(groups[0]): n1, str(groups[1]): n2},
         descriptive_stats={
-            str(groups[0]): {"median": float(group1_data.median()), "iqr": float(group1_data.quantile(0.75) - group1_data.quantile(0.25))},
-            str(groups[1]): {"median": float(group2_data.median()), "iqr": float(group2_data.quantile(0.75) - group2_data.quantile(0.25))}
+            str(groups[0]): {"median": desc1["median"], "iqr": desc1["iqr"]},
+            str(groups[1]): {"median": desc2["median"], "iqr": desc2["iqr"]}
         }
     )
 
 def perform_survival_analysis(df: pd.DataFrame, time_var: str, event_var: str, group_var: str) -> StatisticalResult:
     """Perform Kaplan-Meier survival analysis"""
-    from lifelines import KaplanMeierFitter
-    from lifelines.statistics import logrank_test
-    import numpy as np
-    
     # Clean the data
-    clean_df = df[[time_var, event_var, group_var]].copy().dropna()
+    clean_df = df[[time_var, event_var, group_var]].dropna()
     
     # Convert time to numeric
     time_data = pd.to_numeric(clean_df[time_var], errors='coerce')
@@ -610,41 +707,38 @@ def perform_survival_analysis(df: pd.DataFrame, time_var: str, event_var: str, g
         event_data = event_data.astype(int)
     else:
         # For text values, try to map common patterns
-        event_mapping = {}
-        for val in unique_events:
-            str_val = str(val).lower().strip()
-            if str_val in ['1', 'true', 'yes', 'dead', 'death', 'event', 'deceased']:
-                event_mapping[val] = 1
-            else:
-                event_mapping[val] = 0
-        event_data = event_data.map(event_mapping).fillna(0).astype(int)
+        labels = np.char.lower(np.char.strip(event_data.to_numpy().astype(str)))
+        event_data = pd.Series(np.isin(labels, EVENT_LABELS).astype(int), index=event_data.index)
     
-    # Remove invalid time values
-    valid_mask = ~time_data.isna()
+    # Remove invalid time values, then work on plain arrays
+    time_data = time_data.to_numpy(dtype=np.float64)
+    valid_mask = ~np.isnan(time_data)
     time_data = time_data[valid_mask]
-    event_data = event_data[valid_mask]
-    clean_df = clean_df[valid_mask].reset_index(drop=True)
+    event_data = event_data.to_numpy(dtype=np.int64)[valid_mask]
+    group_data = clean_df[group_var].to_numpy()[valid_mask]
     
-    # Get groups
-    groups = clean_df[group_var].unique()
+    # Get groups as contiguous slices of the data sorted by group code
+    codes, groups = pd.factorize(group_data)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    time_sorted = time_data[order]
+    event_sorted = event_data[order]
     
     # Calculate group-wise statistics
     group_stats = {}
     survival_data = {}
     
-    for group in groups:
-        mask = clean_df[group_var] == group
-        group_time = time_data[mask].values
-        group_event = event_data[mask].values
+    for i, group in enumerate(groups):
+        group_time = time_sorted[bounds[i]:bounds[i + 1]]
+        group_event = event_sorted[bounds[i]:bounds[i + 1]]
         
-        # Fit Kaplan-Meier
-        kmf = KaplanMeierFitter()
-        kmf.fit(group_time, group_event, label=str(group))
+        # Kaplan-Meier median
+        median_survival = km_median(group_time, group_event)
         
         group_stats[str(group)] = {
             "sample_size": len(group_event),
             "events": int(group_event.sum()),
-            "median_survival": float(kmf.median_survival_time_) if kmf.median_survival_time_ != np.inf else None
+            "median_survival": median_survival if np.isfinite(median_survival) else None
         }
         
         survival_data[str(group)] = {
@@ -669,9 +763,8 @@ def perform_survival_analysis(df: pd.DataFrame, time_var: str, event_var: str, g
         p_value = None
     
     # Calculate overall median survival
-    kmf_overall = KaplanMeierFitter()
-    kmf_overall.fit(time_data.values, event_data.values)
-    overall_median = float(kmf_overall.median_survival_time_) if kmf_overall.median_survival_time_ != np.inf else None
+    overall_median = km_median(time_data, event_data)
+    overall_median = overall_median if np.isfinite(overall_median) else None
     
     # Format sample sizes for Pydantic model (expects Dict[str, int])
     sample_sizes_formatted = {group: stats["sample_size"] for group, stats in group_stats.items()}
@@ -701,7 +794,7 @@ def get_p_value_interpretation(p_value: float) -> str:
         return "Not significant (p ≥ 0.05)"
 
 class PublicationFigureRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: List[dict]  # row dicts; cell values are left to pandas
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -712,7 +805,7 @@ class PublicationFigureRequest(BaseModel):
     publication_settings: Optional[Dict[str, Any]] = None
 
 class DisplayFigureRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: List[dict]  # row dicts; cell values are left to pandas
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -722,7 +815,7 @@ class DisplayFigureRequest(BaseModel):
     journal_style: str = "nature"
 
 class CodeEditFigureRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: List[dict]  # row dicts; cell values are left to pandas
     outcome_variable: str
     group_variable: str
     analysis_type: str
@@ -734,6 +827,7 @@ class CodeEditFigureRequest(BaseModel):
     format: str = "png"
 
 @app.post("/generate_publication_figure")
+@cache_figure_response
 async def generate_publication_figure(request: PublicationFigureRequest):
     """Generate publication-ready figure using advanced PublicationVizEngine"""
     try:
@@ -750,7 +844,7 @@ async def generate_publication_figure(request: PublicationFigureRequest):
         # Initialize publication engine with journal style
         settings = request.publication_settings or {}
         style = settings.get('journal_style', 'nature')
-        engine = PublicationVizEngine(style=style)
+        engine = get_engine(style)
         
         # Generate figure based on analysis type
         if request.analysis_type in ["independent_ttest", "mann_whitney_u", "one_way_anova"]:
@@ -817,6 +911,7 @@ async def generate_publication_figure(request: PublicationFigureRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate_display_figure")
+@cache_figure_response
 async def generate_display_figure(request: DisplayFigureRequest):
     """Generate publication-ready figure for display in the web interface"""
     try:
@@ -863,7 +958,7 @@ async def generate_display_figure(request: DisplayFigureRequest):
             df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
         # Initialize publication engine with specified journal style
-        engine = PublicationVizEngine(style=request.journal_style)
+        engine = get_engine(request.journal_style)
         
         # Determine the appropriate visualization based on analysis type and data characteristics
         groups = df[request.group_variable].unique()
@@ -974,7 +1069,27 @@ async def generate_display_figure(request: DisplayFigureRequest):
         print(f"ERROR traceback: {error_traceback}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate_display_figure_png")
+async def generate_display_figure_png(request: DisplayFigureRequest,
+                                      if_none_match: Optional[str] = Header(default=None)):
+    """Same figure as /generate_display_figure, returned as raw PNG bytes
+    
+    The engine hands back the PNG bytes directly, skipping base64 in both
+    directions, and the ETag lets the browser revalidate an unchanged figure
+    without downloading it again.
+    """
+    # Bypass the JSON response cache, which holds base64 figures
+    with raw_figure_output():
+        result = await generate_display_figure.__wrapped__(request)
+    png_bytes = result["figure"]
+    etag = f'"{hashlib.blake2b(png_bytes, digest_size=16).hexdigest()}"'
+    headers = {"Cache-Control": "public, max-age=300", "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=png_bytes, media_type="image/png", headers=headers)
+
 @app.post("/generate_code_edit_figure")
+@cache_figure_response
 async def generate_code_edit_figure(request: CodeEditFigureRequest):
     """Generate figure with user-editable code parameters"""
     try:
@@ -989,7 +1104,7 @@ async def generate_code_edit_figure(request: CodeEditFigureRequest):
             df = df.dropna(subset=[request.outcome_variable, request.group_variable])
         
         # Initialize publication engine with specified journal style
-        engine = PublicationVizEngine(style=request.journal_style)
+        engine = get_engine(request.journal_style)
         
         # Generate figure with custom code parameters
         figure_b64 = engine.create_code_editable_figure(
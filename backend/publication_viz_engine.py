@@ -18,10 +18,36 @@ from scipy.cluster.hierarchy import dendrogram, linkage
 from sklearn.metrics import roc_curve, auc
 import base64
 import io
+from bisect import bisect_right
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Tuple, Any, Union
 import warnings
 warnings.filterwarnings('ignore')
 
+# Significance stars for p < 0.001, < 0.01, < 0.05 and otherwise
+_SIGNIFICANCE_THRESHOLDS = (0.001, 0.01, 0.05)
+_SIGNIFICANCE_STARS = ('***', '**', '*', 'ns')
+
+
+def _significance_stars(p_value: float) -> str:
+    """Star label for a p-value; NaN maps to 'ns'"""
+    return _SIGNIFICANCE_STARS[bisect_right(_SIGNIFICANCE_THRESHOLDS, p_value)]
+
+# When set, figure methods return the encoded image bytes instead of base64 text
+_raw_figure_output = ContextVar('raw_figure_output', default=False)
+
+
+@contextmanager
+def raw_figure_output():
+    """Make figure methods called inside the block return raw image bytes"""
+    token = _raw_figure_output.set(True)
+    try:
+        yield
+    finally:
+        _raw_figure_output.reset(token)
+
+
 class PublicationVizEngine:
     """
     Advanced visualization engine for publication-ready scientific figures
@@ -64,11 +90,24 @@ class PublicationVizEngine:
         }
     }
     
+    # Style configuration whose rcParams are currently applied process-wide
+    _active_style_config = None
+    
     def __init__(self, style: str = 'nature'):
         """Initialize with journal-specific styling"""
         self.style_config = self.JOURNAL_STYLES.get(style, self.JOURNAL_STYLES['nature'])
+        self._rc_params = self._build_rc_params(self.style_config)
         self._setup_matplotlib_defaults()
     
+    def apply_style(self):
+        """Make this engine's journal style the active matplotlib defaults
+        
+        rcParams are process-global, so a long-lived engine only needs to
+        re-apply them when another style has been applied since.
+        """
+        if PublicationVizEngine._active_style_config is not self.style_config:
+            self._setup_matplotlib_defaults()
+    
     def _detect_and_convert_event_variable(self, event_series: pd.Series, variable_name: str = "event") -> pd.Series:
         """
         Intelligently detect and convert event variable to proper 0/1 coding
@@ -199,11 +238,10 @@ class PublicationVizEngine:
         
         return validation_result
     
-    def _setup_matplotlib_defaults(self):
-        """Configure matplotlib for publication quality"""
-        config = self.style_config
-        
-        rcParams.update({
+    @staticmethod
+    def _build_rc_params(config: Dict[str, Any]) -> Dict[str, Any]:
+        """matplotlib rcParams for a journal style configuration"""
+        return {
             'font.family': config['font_family'],
             'font.size': config['font_sizes']['ticks'],
             'axes.titlesize': config['font_sizes']['title'],
@@ -231,7 +269,37 @@ class PublicationVizEngine:
             'axes.grid': False,
             'grid.alpha': 0.3,
             'grid.linewidth': 0.8
-        })
+        }
+    
+    def _setup_matplotlib_defaults(self):
+        """Configure matplotlib for publication quality
+        
+        The rcParams dict is built once per engine; switching styles only
+        re-applies it.
+        """
+        rcParams.update(self._rc_params)
+        PublicationVizEngine._active_style_config = self.style_config
+    
+    def _split_by_group(self, data: pd.DataFrame, group_var: str, value_var: str) -> Tuple[np.ndarray, List[pd.Series]]:
+        """Split a column by group using integer group codes
+        
+        The group labels (usually strings) are factorized once, so selecting each
+        group compares small integers instead of re-comparing every label.
+        Groups keep their order of first appearance, as with ``unique()``.
+        """
+        codes, groups = pd.factorize(data[group_var])
+        values = data[value_var]
+        return np.asarray(groups), [values[codes == i] for i in range(len(groups))]
+    
+    def _jitter_offsets(self, group_data: List) -> List[np.ndarray]:
+        """Horizontal jitter for each group's scatter points
+        
+        Drawn in one call from a fixed-seed generator, so the same data always
+        renders the same figure.
+        """
+        sizes = [len(values) for values in group_data]
+        offsets = np.random.default_rng(0).normal(0.0, 0.04, size=sum(sizes))
+        return np.split(offsets, np.cumsum(sizes)[:-1])
     
     def _calculate_figure_size(self, plot_type: str, n_groups: int, data_complexity: str = 'medium') -> Tuple[float, float]:
         """Dynamically calculate optimal figure size based on content - SMALLER for publication"""
@@ -269,7 +337,7 @@ class PublicationVizEngine:
                                  title: str = None, custom_labels: Dict = None, format_type: str = 'png') -> str:
         """Create publication-ready box plot with individual points"""
         
-        groups = data[group_var].unique()
+        groups, group_subsets = self._split_by_group(data, group_var, outcome_var)
         n_groups = len(groups)
         
         fig_width, fig_height = self._calculate_figure_size('box', n_groups)
@@ -277,8 +345,8 @@ class PublicationVizEngine:
         
         # Prepare data for plotting - ensure numeric conversion
         group_data = []
-        for group in groups:
-            group_subset = data[data[group_var] == group][outcome_var].dropna()
+        for group, group_subset in zip(groups, group_subsets):
+            group_subset = group_subset.dropna()
             # Convert to numeric, handling any string values
             try:
                 group_numeric = pd.to_numeric(group_subset, errors='coerce').dropna()
@@ -298,9 +366,10 @@ class PublicationVizEngine:
         
         # Add individual data points with jitter
         colors = self.style_config['colors']
+        jitter = self._jitter_offsets(group_data)
         for i, (group, group_values) in enumerate(zip(groups, group_data)):
             y_values = group_values.values
-            x_values = np.random.normal(i + 1, 0.04, size=len(y_values))
+            x_values = (i + 1) + jitter[i]
             ax.scatter(x_values, y_values, alpha=0.7, s=30, 
                       color=colors[i % len(colors)], zorder=3, edgecolor='white', linewidth=0.5)
         
@@ -782,13 +851,9 @@ class PublicationVizEngine:
                     
                     # Add significance stars
                     if i != j:
-                        p_val = p_values[i, j]
-                        if p_val < 0.001:
-                            text += '***'
-                        elif p_val < 0.01:
-                            text += '**'
-                        elif p_val < 0.05:
-                            text += '*'
+                        stars = _significance_stars(p_values[i, j])
+                        if stars != 'ns':
+                            text += stars
                     
                     # Color text based on correlation strength
                     text_color = 'white' if abs(corr_val) > 0.5 else 'black'
@@ -829,14 +894,7 @@ class PublicationVizEngine:
             ax.plot([2, 2], [y_pos - y_max*0.01, y_pos], 'k-', linewidth=1.5)
             
             # P-value annotation
-            if p_value < 0.001:
-                sig_text = '***'
-            elif p_value < 0.01:
-                sig_text = '**'
-            elif p_value < 0.05:
-                sig_text = '*'
-            else:
-                sig_text = 'ns'
+            sig_text = _significance_stars(p_value)
             
             ax.text(1.5, y_pos + y_max*0.02, sig_text, ha='center', va='bottom',
                    fontsize=self.style_config['font_sizes']['legend'], fontweight='bold')
@@ -933,8 +991,8 @@ class PublicationVizEngine:
                       width=1.2, length=5, color='#000000')
         ax.tick_params(axis='both', which='minor', width=0.8, length=3, color='#000000')
     
-    def _figure_to_base64(self, fig, format_type: str = 'png') -> str:
-        """Convert matplotlib figure to base64 string"""
+    def _figure_to_buffer(self, fig, format_type: str = 'png') -> io.BytesIO:
+        """Save and close a matplotlib figure, returning the encoded image buffer"""
         buffer = io.BytesIO()
         
         # Ensure proper format handling
@@ -953,12 +1011,22 @@ class PublicationVizEngine:
             fig.savefig(buffer, format='png', dpi=self.style_config['dpi'], 
                        bbox_inches='tight', facecolor='white', edgecolor='none')
         
-        buffer.seek(0)
-        image_data = buffer.getvalue()
-        buffer.close()
         plt.close(fig)
+        return buffer
+    
+    def _figure_to_base64(self, fig, format_type: str = 'png') -> Union[str, bytes]:
+        """Convert matplotlib figure to base64 string (raw bytes inside
+        ``raw_figure_output()``)"""
+        buffer = self._figure_to_buffer(fig, format_type)
+        if _raw_figure_output.get():
+            return buffer.getvalue()
+        
+        # Encode straight from the buffer's memory instead of a getvalue() copy
+        with buffer.getbuffer() as image_data:
+            encoded = base64.b64encode(image_data)
+        buffer.close()
         
-        return base64.b64encode(image_data).decode('utf-8')
+        return encoded.decode('ascii')
     
     def create_code_editable_figure(self, data: pd.DataFrame, outcome_var: str, group_var: str,
                                   analysis_type: str, code_params: Dict[str, Any],
@@ -996,8 +1064,8 @@ class PublicationVizEngine:
         
         if analysis_type in ["independent_ttest", "mann_whitney_u", "one_way_anova"]:
             # Custom box plot
-            groups = data[group_var].unique()
-            group_data = [data[data[group_var] == group][outcome_var].dropna() for group in groups]
+            groups, group_data = self._split_by_group(data, group_var, outcome_var)
+            group_data = [group_values.dropna() for group_values in group_data]
             
             box_plot = ax.boxplot(group_data, labels=groups, patch_artist=True,
                                  boxprops=dict(facecolor='lightblue', alpha=0.7, linewidth=line_width),
@@ -1006,9 +1074,10 @@ class PublicationVizEngine:
                                  capprops=dict(linewidth=line_width, color='black'))
             
             # Add individual points with custom styling
+            jitter = self._jitter_offsets(group_data)
             for i, (group, group_values) in enumerate(zip(groups, group_data)):
                 y_values = group_values.values
-                x_values = np.random.normal(i + 1, 0.04, size=len(y_values))
+                x_values = (i + 1) + jitter[i]
                 ax.scatter(x_values, y_values, alpha=0.7, s=marker_size * 5, 
                           color=colors[i % len(colors)], zorder=3, edgecolor='white', linewidth=0.5)
         
@@ -1264,8 +1333,8 @@ class PublicationVizEngine:
         fig, ax = plt.subplots(figsize=(10, 8), dpi=self.style_config['dpi'])
         
         # Prepare data
-        groups = data[group_var].unique()
-        group_data = [data[data[group_var] == g][outcome_var].dropna() for g in groups]
+        groups, group_data = self._split_by_group(data, group_var, outcome_var)
+        group_data = [group_values.dropna() for group_values in group_data]
         
         # Create violin plot
         parts = ax.violinplot(group_data, positions=range(len(groups)),
@@ -1286,9 +1355,10 @@ class PublicationVizEngine:
         
         # Add individual points if requested
         if show_points:
+            jitter = self._jitter_offsets(group_data)
             for i, data_group in enumerate(group_data):
                 y = data_group
-                x = np.random.normal(i, 0.04, size=len(y))
+                x = i + jitter[i]
                 ax.scatter(x, y, alpha=0.3, s=10, color='black')
         
         # Add statistical annotations if requested
@@ -14,7 +14,9 @@ import asyncio
 import argparse
 import getpass
 import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Add the app directory to the Python path
@@ -23,9 +25,12 @@ sys.path.insert(0, str(Path(__file__).parent / "app"))
 from supabase import create_client, Client
 from app.config.settings import settings
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
+
+@lru_cache(maxsize=1)
 def get_admin_db_client() -> Client:
-    """Get admin Supabase client"""
+    """Get admin Supabase client, shared so successive calls reuse its connections"""
     return create_client(
         settings.supabase_url,
         settings.supabase_service_role_key  # Use service role key for admin operations
@@ -143,9 +148,7 @@ async def promote_user_to_admin(email: str):
 
 def validate_email(email: str) -> bool:
     """Basic email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 
 def validate_password(password: str) -> bool:
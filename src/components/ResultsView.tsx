@@ -31,6 +31,9 @@ interface ResultsViewProps {
   project?: any;
 }
 
+// The orchestrator holds no per-analysis state, so one instance serves every run
+const orchestrator = new EngineOrchestrator();
+
 const ResultsView: React.FC<ResultsViewProps> = ({ 
   analysisConfig, 
   onBack, 
@@ -214,8 +217,6 @@ const ResultsView: React.FC<ResultsViewProps> = ({
     setClientError(null);
 
     try {
-      const orchestrator = new EngineOrchestrator();
-      
       let results: AnalysisWorkflow;
       
       // Handle different analysis types
@@ -78,7 +78,30 @@ export interface AnalysisWorkflow {
   final_result: StatisticalResult | { error: string; details?: string[] };
 }
 
+// Numeric values of valueVar for each group, in one pass over the rows. Every
+// group appears (in first-appearance order) even if none of its values parse.
+function splitNumericByGroup(data: any[], groupVar: string, valueVar: string): Map<any, number[]> {
+  const groups = new Map<any, number[]>();
+  for (const row of data) {
+    let values = groups.get(row[groupVar]);
+    if (!values) {
+      values = [];
+      groups.set(row[groupVar], values);
+    }
+    const val = Number(row[valueVar]);
+    if (!isNaN(val)) {
+      values.push(val);
+    }
+  }
+  return groups;
+}
+
 export class DataProfiler {
+  // Profiles per dataset array, dropped along with their array. The cache only
+  // sees the array identity and length, so callers must pass a new array when
+  // the rows change; editing rows in place would return a stale profile.
+  private static cache = new WeakMap<any[], Map<string, DataProfile>>();
+
   static profileData(
     data: any[],
     outcomeVar: string,
@@ -86,6 +109,41 @@ export class DataProfiler {
     timeVar?: string,
     eventVar?: string,
     isPaired: boolean = false
+  ): DataProfile {
+    const key = JSON.stringify([data.length, outcomeVar, groupVar, timeVar, eventVar, isPaired]);
+    let profiles = DataProfiler.cache.get(data);
+    const cached = profiles?.get(key);
+    if (cached) {
+      return DataProfiler.copyProfile(cached);
+    }
+
+    const profile = DataProfiler.buildProfile(data, outcomeVar, groupVar, timeVar, eventVar, isPaired);
+    if (!profiles) {
+      profiles = new Map();
+      DataProfiler.cache.set(data, profiles);
+    }
+    profiles.set(key, profile);
+    return DataProfiler.copyProfile(profile);
+  }
+
+  // Callers get their own copy so changes to a returned profile cannot leak
+  // into later lookups
+  private static copyProfile(profile: DataProfile): DataProfile {
+    return {
+      ...profile,
+      variables: [...profile.variables],
+      group_labels: profile.group_labels && [...profile.group_labels],
+      group_sizes: profile.group_sizes && { ...profile.group_sizes }
+    };
+  }
+
+  private static buildProfile(
+    data: any[],
+    outcomeVar: string,
+    groupVar: string | undefined,
+    timeVar: string | undefined,
+    eventVar: string | undefined,
+    isPaired: boolean
   ): DataProfile {
     if (data.length === 0) {
       throw new Error('Dataset is empty');
@@ -96,9 +154,16 @@ export class DataProfiler {
       throw new Error(`Outcome variable '${outcomeVar}' not found in dataset`);
     }
 
-    // Determine if outcome is continuous or categorical
-    const outcomeValues = data.map(row => row[outcomeVar]).filter(val => val != null);
-    const isNumeric = outcomeValues.every(val => !isNaN(Number(val)));
+    // Determine if outcome is continuous or categorical, stopping at the first
+    // non-numeric value instead of copying the column
+    let isNumeric = true;
+    for (const row of data) {
+      const val = row[outcomeVar];
+      if (val != null && isNaN(Number(val))) {
+        isNumeric = false;
+        break;
+      }
+    }
     const outcomeType: 'continuous' | 'categorical' = isNumeric ? 'continuous' : 'categorical';
 
     const profile: DataProfile = {
@@ -117,15 +182,16 @@ export class DataProfiler {
         throw new Error(`Grouping variable '${groupVar}' not found in dataset`);
       }
 
-      const groups = [...new Set(data.map(row => row[groupVar]))];
+      // Count every group in one pass; Map keeps first-appearance order
+      const groupCounts = new Map<any, number>();
+      for (const row of data) {
+        const group = row[groupVar];
+        groupCounts.set(group, (groupCounts.get(group) ?? 0) + 1);
+      }
+      const groups = [...groupCounts.keys()];
       profile.n_groups = groups.length;
       profile.group_labels = groups;
-      
-      const groupSizes: Record<string, number> = {};
-      groups.forEach(group => {
-        groupSizes[group] = data.filter(row => row[groupVar] === group).length;
-      });
-      profile.group_sizes = groupSizes;
+      profile.group_sizes = Object.fromEntries(groupCounts);
     }
 
     return profile;
@@ -165,15 +231,9 @@ export class AssumptionChecker {
     valueVar: string,
     alpha: number = 0.05
   ): AssumptionResult {
-    const groups = [...new Set(data.map(row => row[groupVar]))];
     const groupVariances: number[] = [];
 
-    for (const group of groups) {
-      const groupData = data
-        .filter(row => row[groupVar] === group)
-        .map(row => Number(row[valueVar]))
-        .filter(val => !isNaN(val));
-      
+    for (const groupData of splitNumericByGroup(data, groupVar, valueVar).values()) {
       if (groupData.length < 2) {
         return {
           test: "Levene's Test",
@@ -907,15 +967,9 @@ export class EngineOrchestrator {
       const requiredAssumptions = testRegistry[recommendation.primary as keyof typeof testRegistry]?.assumptions || [];
 
       if (requiredAssumptions.includes('normality')) {
-        const groups = [...new Set(data.map(row => row[groupVar!]))];
         const normalityChecks: Record<string, any> = {};
         
-        for (const group of groups) {
-          const groupData = data
-            .filter(row => row[groupVar!] === group)
-            .map(row => Number(row[outcomeVar]))
-            .filter(val => !isNaN(val));
-          
+        for (const [group, groupData] of splitNumericByGroup(data, groupVar!, outcomeVar)) {
           normalityChecks[group] = AssumptionChecker.checkNormality(groupData);
           if (!normalityChecks[group].passed) {
             assumptionsPassed = false;